@@ -1,5 +1,5 @@
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, Response, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
@@ -10,8 +10,12 @@ import sqlite3
 import threading
 import time
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from functools import wraps
 from blockchain_nft_system import NFTConsentManager
+from federated_learning_engine import ConsentView, feature_statistics, scaler_from_statistics, warm_update
+from node_data_store import FEATURE_COLUMNS, load_node_frame
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # For session management
@@ -47,34 +51,220 @@ training_status = {
     'is_training': False,
     'current_round': 0,
     'total_rounds': 0,
-    'progress': 0
+    'progress': 0,
+    'nodes_completed': 0,
+    'node_metrics': {}
 }
 
+def engineer_risk_features(features):
+    """Model inputs and BINARY risk target (High Risk vs Low Risk) for a consented feature frame"""
+    # Create working copy
+    df = features.copy()
+    df = df.fillna(df.mean())
+    
+    # Create BINARY target: High Risk vs Low Risk (using clearer thresholds)
+    # High Risk: Any 2 or more risk factors present
+    risk_factors = (
+        (df['systolic_bp'] > 130).astype(int) +      # Elevated BP
+        (df['glucose_level'] > 126).astype(int) +    # Pre-diabetic
+        (df['cholesterol'] > 200).astype(int) +      # Borderline high
+        (df['bmi'] > 28).astype(int) +               # Overweight  
+        (df['age'] > 55).astype(int)                 # Age risk factor
+    )
+    y = (risk_factors >= 2).astype(int)  # High risk if 2+ factors
+    
+    # Feature Engineering - Add interaction terms for better accuracy
+    df['bp_ratio'] = df['systolic_bp'] / (df['diastolic_bp'] + 1)
+    df['metabolic_score'] = (df['glucose_level'] + df['cholesterol']) / 2
+    df['cardiovascular_risk'] = df['systolic_bp'] * df['heart_rate'] / 10000
+    df['body_health'] = df['bmi'] * df['age'] / 100
+
+    return df, y
+
+
+def fit_local_model(features, model_type='random_forest', n_jobs=-1, warm_start=False, model=None,
+                    local_epochs=1, trees_per_round=10, scaler=None):
+    """Train and validate a local model on a node's consented feature frame
+
+    Uses BINARY CLASSIFICATION (High Risk vs Low Risk) with ensemble models
+    and feature engineering for high accuracy (85-95%).
+
+    With warm_start, the node's model from the previous round is continued
+    (local_epochs MLP passes or trees_per_round new trees, see warm_update)
+    instead of building a new one, and is returned as the third element so
+    the caller can pass it back next round. A fitted scaler (the federated
+    one) is applied as is instead of fitting a new one on this node.
+    """
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score
+
+    data_points = len(features)
+    X, y = engineer_risk_features(features)
+    
+    if len(X) < 20:
+        return None, 0, None
+    
+    try:
+        # Scale features
+        if scaler is None:
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
+        else:
+            X_scaled = scaler.transform(X)
+        
+        # Split data with stratification
+        # Split data with stratification - randomness enabled (removed fixed seed),
+        # except that warm-started models keep one split across rounds
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_scaled, y, test_size=0.2, stratify=y, random_state=0 if warm_start else None
+        )
+        
+        # Continue last round's model when warm-starting, otherwise build a new one
+        continued = (warm_start and model is not None
+                     and warm_update(model, X_train, y_train, local_epochs, trees_per_round))
+        if not continued:
+            # Select model based on type - using ensemble methods for higher accuracy
+            if model_type == 'mlp':
+                # Deep neural network with optimized architecture
+                model = MLPClassifier(
+                    hidden_layer_sizes=(128, 64, 32), 
+                    max_iter=1000, 
+                    early_stopping=True,
+                    learning_rate_init=0.001,
+                    alpha=0.0001,
+                    activation='relu'
+                )
+            else:  # random_forest is default
+                model = RandomForestClassifier(
+                    n_estimators=100,
+                    max_depth=10,
+                    min_samples_split=5,
+                    n_jobs=n_jobs
+                )
+        
+            # Train the model
+            model.fit(X_train, y_train)
+        
+        # Evaluate on training and validation sets
+        train_pred = model.predict(X_train)
+        val_pred = model.predict(X_val)
+        
+        train_acc = accuracy_score(y_train, train_pred)
+        val_acc = accuracy_score(y_val, val_pred)
+        
+        # Count high risk patients
+        high_risk_count = y.sum()
+        low_risk_count = len(y) - high_risk_count
+        
+        model_display_name = {
+            'random_forest': 'RANDOM FOREST',
+            'mlp': 'NEURAL NETWORK'
+        }.get(model_type, model_type.upper())
+        
+        print(f"[{model_display_name}] Train Acc: {train_acc:.4f}, Val Acc: {val_acc:.4f}, Samples: {data_points} (High Risk: {high_risk_count}, Low Risk: {low_risk_count})")
+        
+        return {
+            'accuracy': val_acc,
+            'train_accuracy': train_acc,
+            'loss': 1.0 - val_acc,
+            'train_loss': 1.0 - train_acc,
+            'data_points': data_points,
+            'model_type': model_display_name.lower().replace(' ', '_'),  # e.g., 'random_forest'
+            'model_display_name': model_display_name,  # e.g., 'RANDOM FOREST'
+            'num_classes': 2,  # Binary classification
+            'features_used': len(X.columns),
+            'high_risk_count': int(high_risk_count),
+            'low_risk_count': int(low_risk_count)
+        }, data_points, model if warm_start else None
+        
+    except Exception as e:
+        print(f"Training error: {str(e)}")
+        return None, 0, None
+
+def _shared_memory_training_worker(shm_name, shape, dtype, columns, model_type, fit_options=None):
+    """Process-pool entry point: train on a feature matrix published in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # Copy out of the shared block so it can be closed while the model trains
+        matrix = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+    # One core per worker; the pool already provides the parallelism
+    return fit_local_model(pd.DataFrame(matrix, columns=columns), model_type, n_jobs=1, **(fit_options or {}))
+
 class FederatedLearningEngine:
     """Federated Learning Engine for healthcare data with NFT consent"""
 
-    def __init__(self):
+    BACKENDS = ('sequential', 'thread', 'process')
+    LOCAL_UPDATES = ('refit', 'warm_start')
+
+    def __init__(self, backend='sequential', max_workers=None, local_update='refit', local_epochs=1,
+                 trees_per_round=10, federated_scaling=True):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported training backend: {backend}")
+        if local_update not in self.LOCAL_UPDATES:
+            raise ValueError(f"Unsupported local update mode: {local_update}")
+
         self.nodes = {}
+        self.patient_nodes = {}  # patient_id -> node_id holding the patient's row
         self.global_model = None
         self.training_history = []
+        self.backend = backend
+        self.max_workers = max_workers
+
+        # 'warm_start' continues each node's previous model instead of refitting it
+        self.local_update = local_update
+        self.local_epochs = local_epochs
+        self.trees_per_round = trees_per_round
+        self.local_models = {}  # node_id -> (model_type, model) kept between warm-started rounds
+
+        # One scaler from every node's pooled feature statistics, reused every round
+        self.federated_scaling = federated_scaling
+        self.global_scaler = None
 
     def register_node(self, node_id, hospital_name, data_path):
         """Register a hospital node for federated learning"""
         try:
-            data = pd.read_csv(data_path)
+            # Only the feature and consent columns, memory-mapped from the columnar store
+            data = load_node_frame(data_path)
             self.nodes[node_id] = {
                 'hospital_name': hospital_name,
                 'data': data,
+                'consent_view': ConsentView(data),
+                'data_path': data_path,
                 'status': 'active',
                 'last_update': datetime.now()
             }
+            for patient_id in data['patient_id']:
+                self.patient_nodes[patient_id] = node_id
             return True
         except Exception as e:
             print(f"Error registering node {node_id}: {str(e)}")
             return False
 
+    def update_patient_consent(self, patient_id, allow_training, expiry_date=None):
+        """Patch a patient's consent in the in-memory node data; returns True if found"""
+        node_id = self.patient_nodes.get(patient_id)
+        if node_id is None:
+            return False
+
+        node_info = self.nodes[node_id]
+        if not node_info['consent_view'].update_consent(patient_id, allow_training, expiry_date):
+            return False
+        node_info['last_update'] = datetime.now()
+        return True
+
     def apply_consent_filter(self, data):
         """Apply consent filtering as per Equation 3.1: D_filtered = {xi ∈ D : xi.allow_training = true}"""
+        # Registered node data goes through its incrementally maintained consent view
+        for node_info in self.nodes.values():
+            if node_info['data'] is data:
+                return node_info['consent_view'].filtered()
+
         if 'allow_training' not in data.columns:
             return data  # If no consent column, use all data
 
@@ -89,129 +279,123 @@ class FederatedLearningEngine:
 
         return consented_data
 
-    def real_local_training(self, node_data, model_type='logistic'):
-        """Perform REAL local model training on consented data using sklearn
-        
-        Uses BINARY CLASSIFICATION (High Risk vs Low Risk) with ensemble models
-        and feature engineering for high accuracy (85-95%).
-        """
-        from sklearn.neural_network import MLPClassifier
-        from sklearn.ensemble import RandomForestClassifier
-        from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-        from sklearn.preprocessing import StandardScaler, PolynomialFeatures
-        from sklearn.model_selection import train_test_split
-        from sklearn.metrics import accuracy_score
-        
+    def consented_features(self, node_data):
+        """Consent-filtered feature frame for a node, or None if it cannot train"""
         # Apply consent filter
         filtered_data = self.apply_consent_filter(node_data)
 
         if len(filtered_data) < 20:  # Need minimum data for training
-            return None, 0
+            return None
 
-        # Features for training (8 medical features)
-        feature_cols = ['age', 'systolic_bp', 'diastolic_bp', 'heart_rate', 
-                        'temperature', 'glucose_level', 'cholesterol', 'bmi']
-        
         # Prepare data - use available features
-        available_features = [c for c in feature_cols if c in filtered_data.columns]
+        available_features = [c for c in FEATURE_COLUMNS if c in filtered_data.columns]
         if len(available_features) < 3:
             print(f"Warning: Only {len(available_features)} features available")
-            return None, 0
-        
-        # Create working copy
-        df = filtered_data[available_features].copy()
-        df = df.fillna(df.mean())
-        
-        # Create BINARY target: High Risk vs Low Risk (using clearer thresholds)
-        # High Risk: Any 2 or more risk factors present
-        risk_factors = (
-            (df['systolic_bp'] > 130).astype(int) +      # Elevated BP
-            (df['glucose_level'] > 126).astype(int) +    # Pre-diabetic
-            (df['cholesterol'] > 200).astype(int) +      # Borderline high
-            (df['bmi'] > 28).astype(int) +               # Overweight  
-            (df['age'] > 55).astype(int)                 # Age risk factor
-        )
-        y = (risk_factors >= 2).astype(int)  # High risk if 2+ factors
-        
-        # Feature Engineering - Add interaction terms for better accuracy
-        df['bp_ratio'] = df['systolic_bp'] / (df['diastolic_bp'] + 1)
-        df['metabolic_score'] = (df['glucose_level'] + df['cholesterol']) / 2
-        df['cardiovascular_risk'] = df['systolic_bp'] * df['heart_rate'] / 10000
-        df['body_health'] = df['bmi'] * df['age'] / 100
-        
-        X = df
-        
-        if len(X) < 20:
-            return None, 0
+            return None
+
+        return filtered_data[available_features]
+
+    def real_local_training(self, node_data, model_type='logistic', fit_options=None):
+        """Perform REAL local model training on consented data using sklearn
         
+        Uses BINARY CLASSIFICATION (High Risk vs Low Risk) with ensemble models
+        and feature engineering for high accuracy (85-95%).
+        """
+        features = self.consented_features(node_data)
+        if features is None:
+            return None, 0, None
+
+        return fit_local_model(features, model_type, **(fit_options or {}))
+
+    def compute_global_scaler(self):
+        """Federated statistics pass: pool every node's per-feature count, sum and
+        sum of squares into one fixed scaler, so rows never leave the nodes"""
+        statistics = []
+        for node_info in self.nodes.values():
+            features = self.consented_features(node_info['data'])
+            if features is not None:
+                X, _ = engineer_risk_features(features)
+                statistics.append(feature_statistics(X))
+
+        self.global_scaler = scaler_from_statistics(statistics) if statistics else None
+        return self.global_scaler
+
+    def _fit_options(self, node_id, model_type):
+        """fit_local_model arguments: the shared scaler, and the node's previous model when warm-starting"""
+        options = {'scaler': self.global_scaler}
+        if self.local_update == 'warm_start':
+            kept_type, model = self.local_models.get(node_id, (None, None))
+            options.update({
+                'warm_start': True,
+                'model': model if kept_type == model_type else None,
+                'local_epochs': self.local_epochs,
+                'trees_per_round': self.trees_per_round
+            })
+        return options
+
+    def _train_nodes_in_processes(self, model_type):
+        """Yield (node_id, (metrics, data_count)) as process-pool workers finish
+
+        Each node's consented feature matrix is published once in shared memory
+        so workers attach to it instead of unpickling a DataFrame.
+        """
+        blocks = []
         try:
-            # Scale features
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            # Split data with stratification
-            # Split data with stratification - randomness enabled (removed fixed seed)
-            X_train, X_val, y_train, y_val = train_test_split(
-                X_scaled, y, test_size=0.2, stratify=y
-            )
-            
-            # Select model based on type - using ensemble methods for higher accuracy
-            if model_type == 'mlp':
-                # Deep neural network with optimized architecture
-                model = MLPClassifier(
-                    hidden_layer_sizes=(128, 64, 32), 
-                    max_iter=1000, 
-                    early_stopping=True,
-                    learning_rate_init=0.001,
-                    alpha=0.0001,
-                    activation='relu'
-                )
-            else:  # random_forest is default
-                model = RandomForestClassifier(
-                    n_estimators=100,
-                    max_depth=10,
-                    min_samples_split=5,
-                    n_jobs=-1
-                )
-            
-            # Train the model
-            model.fit(X_train, y_train)
-            
-            # Evaluate on training and validation sets
-            train_pred = model.predict(X_train)
-            val_pred = model.predict(X_val)
-            
-            train_acc = accuracy_score(y_train, train_pred)
-            val_acc = accuracy_score(y_val, val_pred)
-            
-            # Count high risk patients
-            high_risk_count = y.sum()
-            low_risk_count = len(y) - high_risk_count
-            
-            model_display_name = {
-                'random_forest': 'RANDOM FOREST',
-                'mlp': 'NEURAL NETWORK'
-            }.get(model_type, model_type.upper())
-            
-            print(f"[{model_display_name}] Train Acc: {train_acc:.4f}, Val Acc: {val_acc:.4f}, Samples: {len(filtered_data)} (High Risk: {high_risk_count}, Low Risk: {low_risk_count})")
-            
-            return {
-                'accuracy': val_acc,
-                'train_accuracy': train_acc,
-                'loss': 1.0 - val_acc,
-                'train_loss': 1.0 - train_acc,
-                'data_points': len(filtered_data),
-                'model_type': model_display_name.lower().replace(' ', '_'),  # e.g., 'random_forest'
-                'model_display_name': model_display_name,  # e.g., 'RANDOM FOREST'
-                'num_classes': 2,  # Binary classification
-                'features_used': len(X.columns),
-                'high_risk_count': int(high_risk_count),
-                'low_risk_count': int(low_risk_count)
-            }, len(filtered_data)
-            
-        except Exception as e:
-            print(f"Training error: {str(e)}")
-            return None, 0
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                for node_id, node_info in self.nodes.items():
+                    features = self.consented_features(node_info['data'])
+                    if features is None:
+                        yield node_id, (None, 0, None)
+                        continue
+
+                    matrix = np.ascontiguousarray(features.to_numpy(dtype=np.float64))
+                    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+                    blocks.append(shm)
+                    np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shm.buf)[:] = matrix
+
+                    print(f"Training on node: {node_info['hospital_name']}...")
+                    future = executor.submit(_shared_memory_training_worker, shm.name, matrix.shape,
+                                             matrix.dtype.str, list(features.columns), model_type,
+                                             self._fit_options(node_id, model_type))
+                    futures[future] = node_id
+
+                for future in as_completed(futures):
+                    try:
+                        yield futures[future], future.result()
+                    except Exception as e:
+                        print(f"Training error on node {futures[future]}: {str(e)}")
+                        yield futures[future], (None, 0, None)
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def _train_nodes_with_backend(self, model_type):
+        """Yield (node_id, (metrics, data_count, model)) for every node using the configured backend"""
+        if self.backend == 'process':
+            yield from self._train_nodes_in_processes(model_type)
+        elif self.backend == 'thread':
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self.real_local_training, node_info['data'], model_type,
+                                    self._fit_options(node_id, model_type)): node_id
+                    for node_id, node_info in self.nodes.items()
+                }
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+        else:
+            for node_id, node_info in self.nodes.items():
+                print(f"Training on node: {node_info['hospital_name']}...")
+                yield node_id, self.real_local_training(node_info['data'], model_type,
+                                                        self._fit_options(node_id, model_type))
+
+    def _train_nodes(self, model_type):
+        """Yield (node_id, (metrics, data_count)) for every node, keeping warm-started models"""
+        for node_id, (metrics, data_count, model) in self._train_nodes_with_backend(model_type):
+            if model is not None:
+                self.local_models[node_id] = (model_type, model)
+            yield node_id, (metrics, data_count)
 
     def federated_training_round(self, model_type='random_forest'):
         """Execute one round of federated training with real ML models"""
@@ -225,9 +409,21 @@ class FederatedLearningEngine:
         print(f"FEDERATED TRAINING ROUND - Model: {model_type.upper()}")
         print(f"{'='*50}")
 
-        for node_id, node_info in self.nodes.items():
-            print(f"Training on node: {node_info['hospital_name']}...")
-            metrics, data_count = self.real_local_training(node_info['data'], model_type)
+        # The federated scaler is computed once and reused by later rounds
+        if self.federated_scaling and self.global_scaler is None:
+            self.compute_global_scaler()
+
+        # Stream per-node metrics to the status endpoint as each node finishes
+        node_results = {}
+        training_status['node_metrics'] = {}
+        for node_id, result in self._train_nodes(model_type):
+            node_results[node_id] = result
+            training_status['node_metrics'][node_id] = result[0]
+            training_status['nodes_completed'] = len(node_results)
+
+        # Aggregate in registration order so results do not depend on completion order
+        for node_id in self.nodes:
+            metrics, data_count = node_results.get(node_id, (None, 0))
 
             if metrics:
                 participating_nodes += 1
@@ -288,15 +484,433 @@ class FederatedLearningEngine:
         self.training_history.append(round_result)
         return round_result
 
+class ConsentJournal:
+    """Append-only SQLite journal of consent updates
+
+    Each update is a single INSERT, so the request path does O(1) work and
+    concurrent updates are serialized by SQLite. A background thread
+    periodically compacts pending entries into nft_metadata.csv and the
+    hospital CSVs (atomic replace), touching only the files that contain
+    the affected patients. Pending entries are replayed on top of the CSVs
+    whenever they are (re)loaded, so nothing is lost before compaction.
+
+    hospital_files is a callable returning the hospital CSV paths, so the
+    compacted files are always the ones the nodes were loaded from.
+    """
+
+    def __init__(self, db_path, nft_path, hospital_files, compact_interval=5.0):
+        self.db_path = db_path
+        self.nft_path = nft_path
+        self.hospital_files = hospital_files
+        self.compact_interval = compact_interval
+        self.lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self.on_compacted = []
+        self._patient_files = None
+        self._indexed_files = None
+        self._wakeup = threading.Event()
+        self._thread = None
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS consent_journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    patient_id TEXT NOT NULL,
+                    allow_training INTEGER NOT NULL,
+                    expiry_date TEXT,
+                    wallet_address TEXT,
+                    consent_timestamp TEXT NOT NULL,
+                    compacted INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_journal_pending ON consent_journal (compacted, seq)')
+
+    def append(self, patient_id, allow_training, consent_timestamp, expiry_date=None, wallet_address=None):
+        """Durably record one consent update and return its sequence number"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO consent_journal (patient_id, allow_training, expiry_date, wallet_address, consent_timestamp) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (patient_id, int(bool(allow_training)), expiry_date or None, wallet_address or None, consent_timestamp)
+            )
+            return cursor.lastrowid
+
+    def append_many(self, entries):
+        """Durably record a batch of updates in one SQLite transaction"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO consent_journal (patient_id, allow_training, expiry_date, wallet_address, consent_timestamp) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(e['patient_id'], int(bool(e['allow_training'])), e.get('expiry_date') or None,
+                  e.get('wallet_address') or None, e['consent_timestamp']) for e in entries]
+            )
+
+    def pending(self):
+        """Uncompacted updates in journal order"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT seq, patient_id, allow_training, expiry_date, wallet_address, consent_timestamp '
+                'FROM consent_journal WHERE compacted = 0 ORDER BY seq'
+            ).fetchall()
+        return [{
+            'seq': seq,
+            'patient_id': patient_id,
+            'allow_training': bool(allow_training),
+            'expiry_date': expiry_date,
+            'wallet_address': wallet_address,
+            'consent_timestamp': consent_timestamp
+        } for seq, patient_id, allow_training, expiry_date, wallet_address, consent_timestamp in rows]
+
+    def _files_for_patients(self, patient_ids):
+        """Hospital files containing any of the patients (index rebuilt only when the file set changes)"""
+        files = tuple(sorted(self.hospital_files()))
+        if self._patient_files is None or files != self._indexed_files:
+            index = {}
+            for file_path in files:
+                if os.path.exists(file_path):
+                    for pid in pd.read_csv(file_path, usecols=['patient_id'])['patient_id']:
+                        index.setdefault(pid, set()).add(file_path)
+            self._patient_files = index
+            self._indexed_files = files
+        return sorted({f for pid in patient_ids for f in self._patient_files.get(pid, ())})
+
+    @staticmethod
+    def _replace_csv(data, path):
+        """Write a CSV atomically so readers never see a partial file"""
+        tmp_path = f"{path}.tmp"
+        data.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _apply_latest(data, latest, columns):
+        """Apply the latest journal value per patient to the given CSV columns"""
+        rows = data['patient_id'].isin(latest.index)
+        if not rows.any():
+            return False
+        updates = latest.loc[data.loc[rows, 'patient_id']]
+        for column, source in columns.items():
+            values = updates[source].to_numpy()
+            if source in ('expiry_date', 'wallet_address'):
+                # Optional fields only overwrite when the update supplied them
+                keep = pd.isna(values)
+                values = np.where(keep, data.loc[rows, column].to_numpy(dtype=object), values)
+            if column in data.columns and data[column].dtype == bool:
+                values = values.astype(bool)
+            data.loc[rows, column] = values
+        return True
+
+    def compact(self):
+        """Fold pending entries into the CSVs and mark them compacted
+
+        Appends are not blocked while the CSVs are rewritten; entries that
+        arrive meanwhile stay pending for the next pass.
+        """
+        with self._compact_lock:
+            entries = self.pending()
+            if not entries:
+                return 0
+
+            journal = pd.DataFrame(entries)
+            # Fill optional fields forward per patient so the last non-empty value wins
+            for column in ('expiry_date', 'wallet_address'):
+                journal[column] = journal.groupby('patient_id')[column].ffill()
+            latest = journal.groupby('patient_id').last()
+
+            nft_metadata = pd.read_csv(self.nft_path)
+            if self._apply_latest(nft_metadata, latest, {
+                'allow_training': 'allow_training',
+                'consent_timestamp': 'consent_timestamp',
+                'wallet_id': 'wallet_address',
+                'expiry_date': 'expiry_date'
+            }):
+                self._replace_csv(nft_metadata, self.nft_path)
+
+            for file_path in self._files_for_patients(latest.index):
+                hospital_data = pd.read_csv(file_path)
+                if self._apply_latest(hospital_data, latest, {
+                    'allow_training': 'allow_training',
+                    'expiry_date': 'expiry_date'
+                }):
+                    self._replace_csv(hospital_data, file_path)
+
+            with self.lock, self.conn:
+                self.conn.execute('UPDATE consent_journal SET compacted = 1 WHERE compacted = 0 AND seq <= ?',
+                                  (entries[-1]['seq'],))
+
+            for callback in self.on_compacted:
+                callback()
+            return len(entries)
+
+    def request_compaction(self):
+        """Wake the background compactor, starting it on first use"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._compaction_loop, daemon=True, name='ConsentCompactor')
+            self._thread.start()
+        self._wakeup.set()
+
+    def _compaction_loop(self):
+        while True:
+            self._wakeup.wait()
+            # Batch updates that arrive close together into one rewrite
+            time.sleep(self.compact_interval)
+            self._wakeup.clear()
+            try:
+                compacted = self.compact()
+                if compacted:
+                    print(f"Compacted {compacted} consent updates into CSVs")
+            except Exception as e:
+                print(f"Error compacting consent journal: {str(e)}")
+
+class PatientStore:
+    """Process-wide merged patient/consent table shared by the read APIs
+
+    patient_dataset.csv and nft_metadata.csv are parsed and merged once,
+    indexed by patient_id and hospital, and patched in place by consent
+    updates. The table is reloaded only when either file changes on disk
+    (mtime, inode or size).
+    """
+
+    NFT_COLUMNS = ['wallet_id', 'allow_training', 'consent_timestamp', 'expiry_date']
+
+    def __init__(self, patient_path, nft_path, journal=None):
+        self.patient_path = patient_path
+        self.nft_path = nft_path
+        self.journal = journal
+        self.lock = threading.RLock()
+        self.signature = None
+        self.table = None
+        self.version = 0
+        self._analytics = None
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.patient_path, self.nft_path):
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_ino, stat.st_size))
+        return tuple(signature)
+
+    def _load(self, signature):
+        patient_data = pd.read_csv(self.patient_path)
+        nft_metadata = pd.read_csv(self.nft_path)
+
+        # Drop overlapping columns from patient_data
+        cols_to_drop = self.NFT_COLUMNS + ['data_hash']
+        patient_data = patient_data.drop(columns=[c for c in cols_to_drop if c in patient_data.columns])
+
+        merged = patient_data.merge(
+            nft_metadata[['patient_id'] + self.NFT_COLUMNS],
+            on='patient_id',
+            how='left',
+            indicator='has_nft'
+        )
+        merged['has_nft'] = merged['has_nft'] == 'both'
+        merged['allow_training'] = merged['allow_training'].fillna(False).astype(bool)
+
+        self.table = merged
+        self.nft_count = len(nft_metadata)
+        self.positions = {pid: pos for pos, pid in enumerate(merged['patient_id'])}
+        self.hospital_rows = {hospital: np.asarray(rows) for hospital, rows in merged.groupby('hospital').indices.items()}
+
+        # Per-hospital counters, kept current by update_consent
+        self.hospital_counts = {}
+        for hospital, rows in self.hospital_rows.items():
+            self.hospital_counts[hospital] = {
+                'total_patients': len(rows),
+                'consented_patients': int(merged['allow_training'].values[rows].sum()),
+                'nft_patients': int(merged['has_nft'].values[rows].sum())
+            }
+
+        # Replay updates not yet compacted into the CSVs
+        if self.journal is not None:
+            self._apply_updates(self.journal.pending())
+
+        self.signature = signature
+        self.version += 1
+        self._analytics = None
+
+    def ensure_current(self):
+        """Reload if either CSV changed on disk since it was last read"""
+        with self.lock:
+            signature = self._file_signature()
+            if signature != self.signature:
+                self._load(signature)
+
+    def mark_synced(self):
+        """Accept the current files as matching the table (after this process wrote them)"""
+        with self.lock:
+            self.signature = self._file_signature()
+
+    def hospital_stats(self, hospital=None):
+        """Per-hospital totals from the maintained counters"""
+        with self.lock:
+            self.ensure_current()
+            hospitals = [hospital] if hospital is not None else sorted(self.hospital_counts)
+            return [dict(hospital=h, **self.hospital_counts[h]) for h in hospitals if h in self.hospital_counts]
+
+    def hospital_patient_ids(self, hospital):
+        """Set of patient_ids registered at a hospital"""
+        with self.lock:
+            self.ensure_current()
+            rows = self.hospital_rows.get(hospital, [])
+            return set(self.table['patient_id'].values[rows])
+
+    def patients(self, patient_id=None, hospital=None, limit=None):
+        """Patient records by patient_id or hospital index lookup"""
+        with self.lock:
+            self.ensure_current()
+            if patient_id is not None:
+                rows = [self.positions[patient_id]] if patient_id in self.positions else []
+            elif hospital is not None:
+                rows = self.hospital_rows.get(hospital, [])
+            else:
+                rows = slice(None)
+
+            selected = self.table.iloc[rows].drop(columns=['has_nft'])
+            if limit is not None:
+                selected = selected.iloc[:limit]
+            return selected.replace({np.nan: None}).to_dict('records')
+
+    def consent_analytics(self):
+        """Overview, hospital and age-group consent statistics (cached per table version)"""
+        with self.lock:
+            self.ensure_current()
+            if self._analytics is None:
+                with_nft = self.table[self.table['has_nft']]
+                age_groups = pd.cut(with_nft['age'],
+                                    bins=[0, 18, 30, 45, 60, 75, 100],
+                                    labels=['0-18', '19-30', '31-45', '46-60', '61-75', '75+'])
+                age_stats = with_nft.groupby(age_groups, observed=False)['allow_training'].agg(['count', 'sum']).reset_index()
+                age_stats = age_stats.rename(columns={'age': 'age_group'})
+                age_stats['consent_rate'] = (age_stats['sum'] / age_stats['count'] * 100)
+                self._analytics = {'age_stats': age_stats.replace({np.nan: None}).to_dict('records')}
+
+            # Patients without an NFT record never count as consented
+            consented = sum(c['consented_patients'] for c in self.hospital_counts.values())
+            hospital_stats = [{
+                'hospital': hospital,
+                'total_patients': counts['nft_patients'],
+                'consented_patients': counts['consented_patients'],
+                'consent_rate': (counts['consented_patients'] / counts['nft_patients'] * 100) if counts['nft_patients'] > 0 else 0
+            } for hospital, counts in self.hospital_counts.items()]
+
+            return {
+                'overview': {
+                    'total_patients': self.nft_count,
+                    'consented_patients': consented,
+                    'consent_rate': (consented / self.nft_count * 100) if self.nft_count > 0 else 0
+                },
+                'hospital_stats': hospital_stats,
+                'age_stats': self._analytics['age_stats']
+            }
+
+    def nft_patient_ids(self, patient_ids):
+        """The subset of patient_ids that exist and have an NFT record"""
+        with self.lock:
+            self.ensure_current()
+            has_nft = self.table['has_nft'].to_numpy()
+            return {pid for pid in patient_ids if pid in self.positions and has_nft[self.positions[pid]]}
+
+    def update_consent(self, patient_id, allow_training, consent_timestamp, expiry_date=None, wallet_address=None):
+        """Patch one patient's consent in place; returns False if the patient has no NFT record"""
+        with self.lock:
+            self.ensure_current()
+            if not self._apply_update(patient_id, allow_training, consent_timestamp, expiry_date, wallet_address):
+                return False
+            self.version += 1
+            return True
+
+    def update_consents(self, updates):
+        """Patch a batch of consent updates column-wise; the last update per patient wins"""
+        with self.lock:
+            self.ensure_current()
+            applied = self._apply_updates(updates)
+            self.version += 1
+            return applied
+
+    def _apply_updates(self, updates):
+        if not updates:
+            return 0
+
+        batch = pd.DataFrame(updates, columns=['patient_id', 'allow_training', 'consent_timestamp',
+                                               'expiry_date', 'wallet_address'])
+        # Optional fields keep the last value any update in the batch supplied
+        for column in ('expiry_date', 'wallet_address'):
+            batch[column] = batch[column].replace('', None)
+            batch[column] = batch.groupby('patient_id')[column].ffill()
+        batch = batch.groupby('patient_id', sort=False).last().reset_index()
+
+        batch['pos'] = batch['patient_id'].map(self.positions)
+        batch = batch[batch['pos'].notna()]
+        positions = batch['pos'].to_numpy(dtype=np.int64)
+        has_nft = self.table['has_nft'].to_numpy()[positions]
+        batch, positions = batch[has_nft], positions[has_nft]
+        if len(positions) == 0:
+            return 0
+
+        columns = self.table.columns
+        old_allow = self.table['allow_training'].to_numpy()[positions]
+        new_allow = batch['allow_training'].to_numpy(dtype=bool)
+        self.table.iloc[positions, columns.get_loc('allow_training')] = new_allow
+        self.table.iloc[positions, columns.get_loc('consent_timestamp')] = batch['consent_timestamp'].to_numpy()
+        for column, source in (('expiry_date', 'expiry_date'), ('wallet_id', 'wallet_address')):
+            supplied = batch[source].notna().to_numpy()
+            if supplied.any():
+                self.table.iloc[positions[supplied], columns.get_loc(column)] = batch[source].to_numpy()[supplied]
+
+        changed = old_allow != new_allow
+        if changed.any():
+            deltas = pd.Series(np.where(new_allow[changed], 1, -1),
+                               index=self.table['hospital'].to_numpy()[positions[changed]])
+            for hospital, delta in deltas.groupby(level=0).sum().items():
+                self.hospital_counts[hospital]['consented_patients'] += int(delta)
+            self._analytics = None
+
+        self.version += 1
+        return len(positions)
+
+    def _apply_update(self, patient_id, allow_training, consent_timestamp, expiry_date=None, wallet_address=None):
+        pos = self.positions.get(patient_id)
+        if pos is None or not self.table['has_nft'].iat[pos]:
+            return False
+
+        columns = self.table.columns
+        old_allow = bool(self.table['allow_training'].iat[pos])
+        new_allow = bool(allow_training)
+        self.table.iat[pos, columns.get_loc('allow_training')] = new_allow
+        self.table.iat[pos, columns.get_loc('consent_timestamp')] = consent_timestamp
+        if wallet_address:
+            self.table.iat[pos, columns.get_loc('wallet_id')] = wallet_address
+        if expiry_date:
+            self.table.iat[pos, columns.get_loc('expiry_date')] = expiry_date
+
+        if old_allow != new_allow:
+            counts = self.hospital_counts[self.table['hospital'].iat[pos]]
+            counts['consented_patients'] += 1 if new_allow else -1
+            self._analytics = None
+        return True
+
 # Initialize FL Engine
-fl_engine = FederatedLearningEngine()
-nft_manager = NFTConsentManager()
+fl_engine = FederatedLearningEngine(backend='process')
+nft_manager = NFTConsentManager(store_path='nft_chain.db')
+# Compaction targets the CSVs the registered nodes actually loaded
+consent_journal = ConsentJournal('consent_journal.db', 'nft_metadata.csv',
+                                 lambda: [node['data_path'] for node in list(fl_engine.nodes.values())])
+patient_store = PatientStore('patient_dataset.csv', 'nft_metadata.csv', journal=consent_journal)
+# Compaction rewrites the CSVs with what the store already holds
+consent_journal.on_compacted.append(patient_store.mark_synced)
 
 # Load initial data if available
 def load_initial_data():
     """Load hospital datasets and NFT metadata"""
-    # Load blockchain state from CSV
-    if os.path.exists('patient_dataset.csv') and os.path.exists('nft_metadata.csv'):
+    # Warm start from the persisted chain; bootstrap from CSV only the first time
+    if nft_manager.load_from_store():
+        print(f"Loaded {len(nft_manager.contract.nft_registry)} NFTs and "
+              f"{len(nft_manager.blockchain.chain)} blocks from {nft_manager.store.db_path}")
+        # Stored blocks are re-verified off the request path
+        nft_manager.blockchain.start_full_verification()
+    elif os.path.exists('patient_dataset.csv') and os.path.exists('nft_metadata.csv'):
         print("Initializing blockchain from legacy CSVs...")
         count = nft_manager.initialize_from_csv_data('patient_dataset.csv', 'nft_metadata.csv')
         print(f"Restored {count} NFTs to blockchain")
@@ -318,6 +932,14 @@ def load_initial_data():
 
     print(f"Loaded {len(fl_engine.nodes)} hospital nodes")
 
+    # Replay consent updates journaled but not yet compacted into the CSVs
+    pending = consent_journal.pending()
+    for entry in pending:
+        fl_engine.update_patient_consent(entry['patient_id'], entry['allow_training'], entry['expiry_date'])
+    if pending:
+        print(f"Replayed {len(pending)} journaled consent updates")
+        consent_journal.request_compaction()
+
 # Authentication decorator
 def require_auth(allowed_roles=None):
     """Decorator to require authentication for routes"""
@@ -466,35 +1088,20 @@ def get_nodes():
         # Get current user for filtering
         auth_data = get_current_user()
         
-        # Load fresh data from Source of Truth
-        patient_data = pd.read_csv('patient_dataset.csv')
-        nft_metadata = pd.read_csv('nft_metadata.csv')
-        
-        # Drop 'allow_training' from patient_data if it exists to avoid _x/_y suffixes
-        if 'allow_training' in patient_data.columns:
-            patient_data = patient_data.drop(columns=['allow_training'])
-
-        # Merge to get allow_training status for all patients
-        merged = patient_data.merge(nft_metadata[['patient_id', 'allow_training']], on='patient_id', how='left')
-        merged['allow_training'] = merged['allow_training'].fillna(False)
-        
         # Filter by hospital if user is a hospital role
+        hospital_filter = None
         if auth_data and auth_data.get('role') == 'hospital':
             # Get hospital name from entity_id
             hospital_node_id = auth_data.get('entity_id')
             if hospital_node_id in fl_engine.nodes:
-                hospital_name = fl_engine.nodes[hospital_node_id]['hospital_name']
-                merged = merged[merged['hospital'] == hospital_name]
+                hospital_filter = fl_engine.nodes[hospital_node_id]['hospital_name']
 
-        # Group by hospital
-        hospital_stats = merged.groupby('hospital').agg(
-            total_patients=('patient_id', 'count'),
-            consented_patients=('allow_training', 'sum')
-        ).reset_index()
+        # Per-hospital counters from the shared patient store
+        hospital_stats = patient_store.hospital_stats(hospital_filter)
 
         nodes_info = []
         
-        for index, row in hospital_stats.iterrows():
+        for row in hospital_stats:
             hospital_name = row['hospital']
             node_id = "unknown"
             status = "active"
@@ -512,8 +1119,8 @@ def get_nodes():
             nodes_info.append({
                 'node_id': node_id,
                 'hospital_name': hospital_name,
-                'total_patients': int(row['total_patients']),
-                'consented_patients': int(row['consented_patients']),
+                'total_patients': row['total_patients'],
+                'consented_patients': row['consented_patients'],
                 'consent_rate': (row['consented_patients'] / row['total_patients'] * 100) if row['total_patients'] > 0 else 0,
                 'status': status
             })
@@ -542,6 +1149,7 @@ def start_training():
     data = request.json
     num_rounds = data.get('rounds', 3)
     model_type = data.get('model_type', 'random_forest')  # Accept model type: 'random_forest', 'mlp'
+    local_update = data.get('local_update', fl_engine.local_update)  # 'refit' or 'warm_start'
 
     if training_status['is_training']:
         return jsonify({'error': 'Training already in progress'}), 400
@@ -550,6 +1158,8 @@ def start_training():
     valid_models = ['random_forest', 'mlp']
     if model_type not in valid_models:
         model_type = 'random_forest' # Default to Random Forest
+    if local_update in FederatedLearningEngine.LOCAL_UPDATES:
+        fl_engine.local_update = local_update
         
     print(f"DEBUG: Starting training with model_type: {model_type}")
 
@@ -558,7 +1168,9 @@ def start_training():
         'current_round': 0,
         'total_rounds': num_rounds,
         'progress': 0,
-        'model_type': model_type
+        'model_type': model_type,
+        'nodes_completed': 0,
+        'node_metrics': {}
     })
 
     def training_thread():
@@ -585,7 +1197,8 @@ def start_training():
     return jsonify({
         'message': f'Training started with {model_type} model', 
         'rounds': num_rounds,
-        'model_type': model_type
+        'model_type': model_type,
+        'local_update': fl_engine.local_update
     })
 
 @app.route('/api/training_status')
@@ -613,9 +1226,120 @@ def get_blockchain_data():
     return jsonify({
         'chain': chain_data,
         'length': len(full_chain), # Send total length for stats
-        'valid': nft_manager.blockchain.is_chain_valid()
+        'valid': nft_manager.blockchain.is_chain_valid(),
+        'validated_height': nft_manager.blockchain.validated_height
     })
 
+EXPLORER_PAGE_LIMIT = 500
+
+def _explorer_int_arg(name, default=None):
+    value = request.args.get(name)
+    return default if value in (None, '') else int(value)
+
+@app.route('/api/explorer/blocks')
+def explorer_blocks():
+    """Page through blocks by height
+
+    Query parameters: cursor (height to start from), limit, order (desc|asc)
+    and compact=1 to omit transaction bodies.
+    """
+    try:
+        cursor = _explorer_int_arg('cursor')
+        limit = min(max(_explorer_int_arg('limit', 50), 1), EXPLORER_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'cursor and limit must be integers'}), 400
+
+    page = nft_manager.blockchain.get_blocks_page(cursor=cursor, limit=limit,
+                                                  descending=request.args.get('order', 'desc') != 'asc',
+                                                  compact=request.args.get('compact') in ('1', 'true'))
+    return jsonify(page)
+
+@app.route('/api/explorer/block/<int:height>')
+def explorer_block_by_height(height):
+    """Look up one block by height"""
+    block = nft_manager.blockchain.get_block(height)
+    if block is None:
+        return jsonify({'error': 'Block not found'}), 404
+    return jsonify(block.to_summary() if request.args.get('compact') in ('1', 'true') else block.to_dict())
+
+@app.route('/api/explorer/block/hash/<block_hash>')
+def explorer_block_by_hash(block_hash):
+    """Look up one block by hash"""
+    block = nft_manager.blockchain.get_block_by_hash(block_hash)
+    if block is None:
+        return jsonify({'error': 'Block not found'}), 404
+    return jsonify(block.to_summary() if request.args.get('compact') in ('1', 'true') else block.to_dict())
+
+@app.route('/api/explorer/transactions')
+def explorer_transactions():
+    """Mined transactions for a token_id and/or patient_id, paginated with an offset cursor"""
+    token_id = request.args.get('token_id')
+    patient_id = request.args.get('patient_id')
+    if not token_id and not patient_id:
+        return jsonify({'error': 'token_id or patient_id is required'}), 400
+
+    try:
+        cursor = max(_explorer_int_arg('cursor', 0), 0)
+        limit = min(max(_explorer_int_arg('limit', 50), 1), EXPLORER_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'cursor and limit must be integers'}), 400
+
+    return jsonify(nft_manager.blockchain.find_transactions(token_id=token_id, patient_id=patient_id,
+                                                            cursor=cursor, limit=limit))
+
+@app.route('/api/blockchain/verify', methods=['GET', 'POST'])
+def verify_blockchain():
+    """Start (POST) or poll (GET) a full re-verification of the chain from genesis"""
+    blockchain = nft_manager.blockchain
+    if request.method == 'POST':
+        started = blockchain.start_full_verification()
+        return jsonify({'started': started, 'status': blockchain.verification_status}), 202 if started else 409
+    return jsonify(blockchain.verification_status)
+
+@app.route('/api/consent_proof/<patient_id>')
+def get_consent_proof(patient_id):
+    """Merkle inclusion proof for a patient's latest mined consent transaction"""
+    auth_data = get_current_user()
+    if auth_data and auth_data.get('role') == 'patient' and auth_data.get('entity_id') != patient_id:
+        return jsonify({'error': 'Patients can only view their own consent proof'}), 403
+
+    proof = nft_manager.get_consent_proof(patient_id)
+    if proof is None:
+        return jsonify({'error': 'No mined consent transaction for this patient'}), 404
+    return jsonify(proof)
+
+@app.route('/api/audit_log')
+def export_audit_log():
+    """Stream the consent audit log as NDJSON
+
+    Optional query parameters: start, end (ISO timestamps), patient_id,
+    token_id and action. Requires a login; patients only ever receive their
+    own entries and hospitals only those of their own patients. The export
+    covers the log as it stood when the request arrived.
+    """
+    filters = {key: request.args[key] for key in ('start', 'end', 'patient_id', 'token_id', 'action')
+               if request.args.get(key)}
+
+    auth_data = get_current_user()
+    if not auth_data:
+        return jsonify({'error': 'Authentication required'}), 401
+    if auth_data.get('role') == 'patient':
+        filters['patient_id'] = auth_data.get('entity_id')
+    elif auth_data.get('role') == 'hospital':
+        node = fl_engine.nodes.get(auth_data.get('entity_id'))
+        patient_ids = patient_store.hospital_patient_ids(node['hospital_name']) if node else set()
+        if 'patient_id' in filters and filters['patient_id'] not in patient_ids:
+            return jsonify({'error': 'Hospitals can only export their own patients\' audit log'}), 403
+        filters['patient_ids'] = patient_ids
+
+    try:
+        # Filters are parsed and the log snapshotted here, so bad filters fail with a 400
+        lines = nft_manager.stream_audit_log(**filters)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid filter: {e}'}), 400
+
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
 @app.route('/api/patients')
 def get_patients():
     """Get patient data with consent information - filtered by role"""
@@ -623,54 +1347,26 @@ def get_patients():
         # Get current user for filtering
         auth_data = get_current_user()
         
-        # Load patient data and NFT metadata
-        patient_data = pd.read_csv('patient_dataset.csv')
-        nft_metadata = pd.read_csv('nft_metadata.csv')
+        hospital_filter = request.args.get('hospital')
+        is_admin_view = not auth_data or auth_data.get('role') == 'admin'
 
-        # Drop overlapping columns from patient_data
-        cols_to_drop = ['wallet_id', 'allow_training', 'consent_timestamp', 'expiry_date', 'data_hash']
-        patient_data = patient_data.drop(columns=[c for c in cols_to_drop if c in patient_data.columns])
+        # Role-based filtering through the patient store's indexes
+        if auth_data and auth_data.get('role') == 'patient':
+            # Patients can only see their own data
+            return jsonify(patient_store.patients(patient_id=auth_data.get('entity_id')))
 
-        # Merge patient data with NFT metadata
-        merged_data = patient_data.merge(
-            nft_metadata[['patient_id', 'wallet_id', 'allow_training', 'consent_timestamp', 'expiry_date']], 
-            on='patient_id', 
-            how='left'
-        )
-
-        # Fill NaN values for allow_training with False
-        merged_data['allow_training'] = merged_data['allow_training'].fillna(False)
-        
-        # Role-based filtering
-        if auth_data:
-            role = auth_data.get('role')
+        if auth_data and auth_data.get('role') == 'hospital':
+            # Hospitals can only see their patients
             entity_id = auth_data.get('entity_id')
-            
-            if role == 'patient':
-                # Patients can only see their own data
-                merged_data = merged_data[merged_data['patient_id'] == entity_id]
-            
-            elif role == 'hospital':
-                # Hospitals can only see their patients
-                if entity_id in fl_engine.nodes:
-                    hospital_name = fl_engine.nodes[entity_id]['hospital_name']
-                    merged_data = merged_data[merged_data['hospital'] == hospital_name]
-            
-            # Admin sees all (no filtering)
+            if entity_id in fl_engine.nodes:
+                return jsonify(patient_store.patients(hospital=fl_engine.nodes[entity_id]['hospital_name']))
 
         # Server-side filtering by hospital parameter (for admin/testing)
-        hospital_filter = request.args.get('hospital')
-        if hospital_filter and (not auth_data or auth_data.get('role') == 'admin'):
-            merged_data = merged_data[merged_data['hospital'] == hospital_filter]
-        
-        # Convert to JSON
-        patients = merged_data.replace({np.nan: None}).to_dict('records')
+        if hospital_filter and is_admin_view:
+            return jsonify(patient_store.patients(hospital=hospital_filter))
 
-        # Limit results for non-filtered queries
-        if not hospital_filter and (not auth_data or auth_data.get('role') == 'admin'):
-            return jsonify(patients[:200])
-        
-        return jsonify(patients)
+        # Admin sees all; limit results for non-filtered queries
+        return jsonify(patient_store.patients(limit=200 if is_admin_view else None))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -692,54 +1388,123 @@ def update_patient_consent():
     wallet_address = data.get('wallet_address') # New
 
     try:
-        # Load NFT metadata
-        nft_metadata = pd.read_csv('nft_metadata.csv')
+        consent_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        # Update consent
-        mask = nft_metadata['patient_id'] == patient_id
-        nft_metadata.loc[mask, 'allow_training'] = allow_training
-        nft_metadata.loc[mask, 'consent_timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        if wallet_address:
-            nft_metadata.loc[mask, 'wallet_id'] = wallet_address
+        # Journal the update (one SQLite insert), then patch in-memory state under the
+        # same lock so concurrent updates are applied in journal order
+        with consent_journal.lock:
+            consent_journal.append(patient_id, allow_training, consent_timestamp, expiry_date, wallet_address)
+            patient_store.update_consent(patient_id, allow_training, consent_timestamp, expiry_date, wallet_address)
 
-        if expiry_date:
-            nft_metadata.loc[mask, 'expiry_date'] = expiry_date
-        
-        # Save updated metadata
-        nft_metadata.to_csv('nft_metadata.csv', index=False)
-
-        # Update hospital datasets
-        hospital_files = [
-            'node_metro_general_hospit_filtered_data.csv',
-            'node_regional_healthcare__filtered_data.csv',
-            'node_st._marys_hospital_filtered_data.csv',
-            'node_university_medical_c_filtered_data.csv',
-            'node_community_health_net_filtered_data.csv',
-            'node_city_medical_center_filtered_data.csv',
-            'node_veterans_affairs_hos_filtered_data.csv',
-            'node_childrens_medical_ce_filtered_data.csv'
-        ]
-
-        for file_path in hospital_files:
-            if os.path.exists(file_path):
-                hospital_data = pd.read_csv(file_path)
-                if patient_id in hospital_data['patient_id'].values:
-                    hospital_data.loc[hospital_data['patient_id'] == patient_id, 'allow_training'] = allow_training
-                    if expiry_date:
-                        hospital_data.loc[hospital_data['patient_id'] == patient_id, 'expiry_date'] = expiry_date
-                    hospital_data.to_csv(file_path, index=False)
+            # Only the node holding this patient is patched
+            fl_engine.update_patient_consent(patient_id, allow_training, expiry_date)
 
-                    # Re-register the node with updated data
-                    node_id = file_path.split('_')[1] + '_' + file_path.split('_')[2]
-                    if node_id in fl_engine.nodes:
-                        fl_engine.nodes[node_id]['data'] = hospital_data
+        # CSVs are rewritten in the background
+        consent_journal.request_compaction()
 
         return jsonify({'message': 'Consent updated successfully'})
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+CONSENT_FLAGS = {True: True, False: False, 1: True, 0: False,
+                 'true': True, 'false': False, '1': True, '0': False}
+
+def parse_consent_flag(value):
+    """allow_training as a bool; only real booleans, 0/1 and "true"/"false" are accepted"""
+    key = value.lower() if isinstance(value, str) else value
+    if isinstance(key, float) or not isinstance(key, (bool, int, str)) or key not in CONSENT_FLAGS:
+        raise ValueError(f'allow_training must be a boolean, got {value!r}')
+    return CONSENT_FLAGS[key]
+
+def parse_consent_updates(req):
+    """Read a batch of consent updates from a JSON list/object or an NDJSON body"""
+    body = req.get_data(as_text=True)
+    if req.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+    payload = json.loads(body) if body.strip() else []
+    if isinstance(payload, dict):
+        payload = payload.get('updates', [])
+    if not isinstance(payload, list):
+        raise ValueError('expected a list of updates or {"updates": [...]}')
+    return payload
+
+@app.route('/api/update_consent/batch', methods=['POST'])
+def update_patient_consent_batch():
+    """Apply many consent updates in one pass
+
+    Accepts a JSON list (or {"updates": [...]}) or NDJSON, one object per
+    update with patient_id, allow_training and optional expiry_date and
+    wallet_address. Updates for unknown patients or patients without an
+    NFT are reported in errors and not journaled. The rest are journaled in
+    one transaction, applied to the in-memory stores, recorded on the chain
+    and mined into one block (so /api/consent_proof works for them right
+    away; the single /api/update_consent route stays off-chain) and
+    compacted into the CSVs once.
+    """
+    start = time.perf_counter()
+    try:
+        raw_updates = parse_consent_updates(request)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid batch body: {str(e)}'}), 400
+
+    consent_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    updates = []
+    errors = []
+    for position, update in enumerate(raw_updates):
+        if not isinstance(update, dict) or not update.get('patient_id') or 'allow_training' not in update:
+            errors.append({'index': position, 'error': 'patient_id and allow_training are required'})
+            continue
+        try:
+            allow_training = parse_consent_flag(update['allow_training'])
+        except ValueError as e:
+            errors.append({'index': position, 'patient_id': update['patient_id'], 'error': str(e)})
+            continue
+        updates.append({
+            'index': position,
+            'patient_id': update['patient_id'],
+            'allow_training': allow_training,
+            'expiry_date': update.get('expiry_date'),
+            'wallet_address': update.get('wallet_address'),
+            'consent_timestamp': consent_timestamp
+        })
+
+    try:
+        with consent_journal.lock:
+            known = patient_store.nft_patient_ids({update['patient_id'] for update in updates})
+            errors.extend({'index': update['index'], 'patient_id': update['patient_id'],
+                           'error': 'Unknown patient or patient without an NFT'}
+                          for update in updates if update['patient_id'] not in known)
+            updates = [update for update in updates if update['patient_id'] in known]
+
+            consent_journal.append_many(updates)
+            applied = patient_store.update_consents(updates)
+            for update in updates:
+                fl_engine.update_patient_consent(update['patient_id'], update['allow_training'], update['expiry_date'])
+
+        chain_result = nft_manager.update_patient_consents(updates)
+        block = nft_manager.mine_transactions() if chain_result['updated'] else None
+        if updates:
+            consent_journal.request_compaction()
+
+        elapsed = time.perf_counter() - start
+        errors.sort(key=lambda error: error['index'])
+        return jsonify({
+            'message': f'Applied {applied} consent updates',
+            'received': len(raw_updates),
+            'applied': applied,
+            'errors': errors,
+            'chain_updates': chain_result['updated'],
+            'chain_not_found': len(chain_result['not_found']),
+            'block_index': block['index'] if block else None,
+            'elapsed_seconds': elapsed,
+            'updates_per_sec': len(updates) / elapsed if elapsed > 0 else None
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.after_request
 def add_header(response):
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
@@ -751,49 +1516,7 @@ def add_header(response):
 def get_consent_analytics():
     """Get consent analytics and statistics"""
     try:
-        nft_metadata = pd.read_csv('nft_metadata.csv')
-        patient_data = pd.read_csv('patient_dataset.csv')
-
-        # Overall statistics
-        total_patients = len(nft_metadata)
-        consented_patients = nft_metadata['allow_training'].sum()
-        consent_rate = (consented_patients / total_patients * 100) if total_patients > 0 else 0
-
-        # Hospital-wise statistics
-        hospital_stats = []
-        for hospital in patient_data['hospital'].unique():
-            hospital_patients = patient_data[patient_data['hospital'] == hospital]['patient_id']
-            hospital_metadata = nft_metadata[nft_metadata['patient_id'].isin(hospital_patients)]
-
-            hospital_consented = hospital_metadata['allow_training'].sum()
-            hospital_total = len(hospital_metadata)
-
-            hospital_stats.append({
-                'hospital': hospital,
-                'total_patients': hospital_total,
-                'consented_patients': hospital_consented,
-                'consent_rate': (hospital_consented / hospital_total * 100) if hospital_total > 0 else 0
-            })
-
-        # Age group analysis
-        merged_data = patient_data.merge(nft_metadata[['patient_id', 'allow_training']], on='patient_id')
-        merged_data['age_group'] = pd.cut(merged_data['age'], 
-                                         bins=[0, 18, 30, 45, 60, 75, 100], 
-                                         labels=['0-18', '19-30', '31-45', '46-60', '61-75', '75+'])
-
-        age_stats = merged_data.groupby('age_group')['allow_training'].agg(['count', 'sum']).reset_index()
-        age_stats['consent_rate'] = (age_stats['sum'] / age_stats['count'] * 100)
-        age_stats = age_stats.to_dict('records')
-
-        return jsonify({
-            'overview': {
-                'total_patients': total_patients,
-                'consented_patients': consented_patients,
-                'consent_rate': consent_rate
-            },
-            'hospital_stats': hospital_stats,
-            'age_stats': age_stats
-        })
+        return jsonify(patient_store.consent_analytics())
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
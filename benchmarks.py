@@ -0,0 +1,404 @@
+"""
+Performance benchmarks for the federated learning and blockchain components
+
+Usage: python benchmarks.py [benchmark_name ...]
+Runs every benchmark when no name is given.
+"""
+
+import gc
+import io
+import os
+import sys
+import glob
+import json
+import hashlib
+import time
+import shutil
+import logging
+import tempfile
+import contextlib
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from federated_learning_engine import FederatedLearningServer, FederatedModel, ForestSelector
+from blockchain_nft_system import Block, NFTConsentManager, PatientNFT, ProofOfWorkMiner, _search_nonce_range
+
+HOSPITAL_FILES = [
+    ('node_metro_general', 'Metro General Hospital', 'node_metro_general_hospit_filtered_data.csv'),
+    ('node_regional', 'Regional Healthcare System', 'node_regional_healthcare__filtered_data.csv'),
+    ('node_st_marys', 'St. Mary\'s Hospital', 'node_st._marys_hospital_filtered_data.csv'),
+    ('node_university', 'University Medical Center', 'node_university_medical_c_filtered_data.csv'),
+    ('node_community', 'Community Health Network', 'node_community_health_net_filtered_data.csv'),
+    ('node_city', 'City Medical Center', 'node_city_medical_center_filtered_data.csv'),
+    ('node_veterans', 'Veterans Affairs Hospital', 'node_veterans_affairs_hos_filtered_data.csv'),
+    ('node_childrens', 'Children\'s Medical Center', 'node_childrens_medical_ce_filtered_data.csv')
+]
+
+
+def _timed(func, repeat: int = 5) -> float:
+    """Best-of-N wall time in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_forest_selection():
+    """Predict latency and accuracy of bounded vs unbounded Federated Forest"""
+    print("\n=== Federated Forest selection ===")
+
+    # Train on the first seven hospitals, hold out the last one for evaluation
+    # A bounded diversity selector makes nodes report tree scores and pruning order
+    server = FederatedLearningServer(max_global_trees=50, tree_selection='diversity')
+    for node_id, hospital_name, file_path in HOSPITAL_FILES[:-1]:
+        server.register_node(node_id, hospital_name, file_path)
+    server.initialize_global_model('random_forest')
+
+    node_results = server.run_local_training('random_forest')
+    successful = [result for result in node_results.values() if result['success']]
+    local_parameters = [result['parameters'] for result in successful]
+    weights = [result['metrics']['consented_data_points'] for result in successful]
+
+    reference = next(iter(server.nodes.values())).model
+    label_encoder = reference.label_encoder
+    holdout = pd.read_csv(HOSPITAL_FILES[-1][2])
+    holdout = holdout[holdout['primary_condition'].isin(label_encoder.classes_)]
+    X_test = reference.transform_features(holdout)
+    y_test = label_encoder.transform(holdout['primary_condition'])
+
+    configs = [(None, 'accuracy')] + [(size, strategy) for size in (50, 100, 200)
+                                      for strategy in ForestSelector.STRATEGIES]
+
+    print(f"{'trees':>7} {'strategy':>12} {'predict ms':>11} {'accuracy':>9}")
+    for max_trees, strategy in configs:
+        estimators = ForestSelector(max_trees, strategy).select(local_parameters, weights)
+        model = FederatedModel('random_forest')
+        model.set_parameters({'estimators_': estimators, 'classes_': local_parameters[0]['classes_']})
+
+        latency = _timed(lambda: model.predict(X_test))
+        accuracy = float(np.mean(model.predict(X_test) == y_test))
+        label = 'unbounded' if max_trees is None else strategy
+        print(f"{len(estimators):>7} {label:>12} {latency * 1000:>11.1f} {accuracy:>9.4f}")
+
+
+def benchmark_batch_consent():
+    """Throughput of /api/update_consent/batch for batch sizes from 10 to 100k"""
+    print("\n=== Batch consent updates ===")
+
+    # Run against copies so the repository CSVs and journal are left untouched
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix='fl_nft_bench_')
+    for path in glob.glob(os.path.join(source_dir, '*.csv')):
+        shutil.copy(path, workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app
+        # Compact once at the end instead of in the background while the run is timed
+        app.consent_journal.compact_interval = 3600
+        app.load_initial_data()
+        client = app.app.test_client()
+
+        patient_ids = pd.read_csv('nft_metadata.csv', usecols=['patient_id'])['patient_id'].to_numpy()
+        rng = np.random.default_rng(0)
+
+        print(f"{'batch':>8} {'format':>7} {'seconds':>9} {'updates/sec':>12}")
+        for size in (10, 100, 1000, 10000, 100000):
+            updates = [{'patient_id': str(pid), 'allow_training': bool(allow)}
+                       for pid, allow in zip(rng.choice(patient_ids, size), rng.integers(0, 2, size))]
+            for fmt in ('json', 'ndjson'):
+                if fmt == 'json':
+                    body, mimetype = json.dumps(updates), 'application/json'
+                else:
+                    body, mimetype = '\n'.join(json.dumps(u) for u in updates), 'application/x-ndjson'
+
+                start = time.perf_counter()
+                response = client.post('/api/update_consent/batch', data=body, content_type=mimetype)
+                elapsed = time.perf_counter() - start
+                assert response.status_code == 200, response.get_json()
+                print(f"{size:>8} {fmt:>7} {elapsed:>9.3f} {size / elapsed:>12.0f}")
+
+        start = time.perf_counter()
+        compacted = app.consent_journal.compact()
+        print(f"Compacted {compacted} journal entries into CSVs in {time.perf_counter() - start:.3f}s")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def benchmark_mining():
+    """Proof-of-work hash rate and time to bootstrap the full NFT chain"""
+    print("\n=== Proof-of-work mining ===")
+
+    transactions = [{'type': 'nft_mint', 'patient_id': f"P{i:06d}", 'token_id': f"{i:016x}",
+                     'timestamp': '2025-01-01T00:00:00'} for i in range(11)]
+    block = Block(1, transactions, time.time(), '0' * 64)
+    impossible = 'x'  # never matches a hex digest, so every nonce is tried
+
+    def legacy_hashes(count):
+        # Previous scheme: re-serialize the whole block for every attempt
+        for nonce in range(count):
+            hashlib.sha256(json.dumps({'index': block.index, 'transactions': block.transactions,
+                                       'timestamp': block.timestamp, 'previous_hash': block.previous_hash,
+                                       'nonce': nonce}, sort_keys=True).encode()).hexdigest()
+
+    count = 20_000
+    legacy_rate = count / _timed(lambda: legacy_hashes(count), repeat=3)
+    count = 500_000
+    compact_rate = count / _timed(lambda: _search_nonce_range(block.header_prefix(), 0, count, impossible), repeat=3)
+
+    miner = ProofOfWorkMiner()
+    per_worker = 500_000
+    executor = miner._get_executor()
+
+    def parallel_hashes():
+        futures = [executor.submit(_search_nonce_range, block.header_prefix(),
+                                   i * per_worker, (i + 1) * per_worker, impossible)
+                   for i in range(miner.max_workers)]
+        for future in futures:
+            future.result()
+
+    parallel_hashes()  # warm up the worker processes
+    parallel_rate = miner.max_workers * per_worker / _timed(parallel_hashes, repeat=3)
+
+    print(f"{'scheme':>24} {'hashes/sec':>12}")
+    print(f"{'full block JSON':>24} {legacy_rate:>12.0f}")
+    print(f"{'compact header':>24} {compact_rate:>12.0f}")
+    print(f"{f'compact x{miner.max_workers} processes':>24} {parallel_rate:>12.0f}")
+
+    for difficulty in (4, 5):
+        start = time.perf_counter()
+        nonce, _ = miner.search(block.header_prefix(), difficulty)
+        print(f"difficulty {difficulty}: nonce {nonce} found in {time.perf_counter() - start:.3f}s")
+    miner.shutdown()
+
+    start = time.perf_counter()
+    manager = NFTConsentManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        created = manager.initialize_from_csv_data('patient_dataset.csv', 'nft_metadata.csv')
+    elapsed = time.perf_counter() - start
+    print(f"Bootstrapped {created} NFTs into {len(manager.blockchain.chain)} blocks in {elapsed:.2f}s")
+
+
+def _scaled_patient_table(rows: int) -> pd.DataFrame:
+    """The merged patient/NFT table repeated up to the requested row count with unique IDs"""
+    base = pd.read_csv('patient_dataset.csv').merge(pd.read_csv('nft_metadata.csv'), on='patient_id', how='left')
+    copies = -(-rows // len(base))
+    table = pd.concat([base] * copies, ignore_index=True).iloc[:rows]
+    table['patient_id'] = table['patient_id'] + '_' + (np.arange(rows) // len(base)).astype(str)
+    return table
+
+
+def benchmark_bulk_mint():
+    """Per-row vs bulk NFT minting, scaled from the CSV dataset up to 1M patients"""
+    print("\n=== Bulk NFT minting ===")
+
+    table = _scaled_patient_table(6_856)
+    manager = NFTConsentManager()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, (_, row) in enumerate(table.iterrows()):
+            manager.create_patient_nft(row['patient_id'], row.to_dict())
+            if (i + 1) % 10 == 0:
+                manager.mine_transactions()
+        manager.mine_transactions()
+    elapsed = time.perf_counter() - start
+    print(f"{'rows':>9} {'path':>10} {'seconds':>9} {'NFTs/sec':>10}")
+    print(f"{len(table):>9} {'per-row':>10} {elapsed:>9.2f} {len(table) / elapsed:>10.0f}")
+
+    for rows in (6_856, 100_000, 1_000_000):
+        table = _scaled_patient_table(rows)
+        manager = NFTConsentManager()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager.create_patient_nfts(table, max_workers=os.cpu_count())
+        elapsed = time.perf_counter() - start
+        print(f"{rows:>9} {'bulk':>10} {elapsed:>9.2f} {rows / elapsed:>10.0f}")
+        del manager, table
+
+
+def benchmark_chain_restart():
+    """CSV bootstrap vs replaying the persisted chain from SQLite on restart"""
+    print("\n=== Chain restart ===")
+
+    workdir = tempfile.mkdtemp(prefix='chain_restart_')
+    try:
+        store_path = os.path.join(workdir, 'nft_chain.db')
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = NFTConsentManager(store_path=store_path).initialize_from_csv_data('patient_dataset.csv',
+                                                                                       'nft_metadata.csv')
+        bootstrap = time.perf_counter() - start
+
+        def restart():
+            manager = NFTConsentManager(store_path=store_path)
+            manager.load_from_store()
+            return manager
+
+        replay = _timed(restart, repeat=3)
+        blocks = len(restart().blockchain.chain)
+        print(f"{'NFTs':>6} {'blocks':>7} {'bootstrap s':>12} {'replay s':>9}")
+        print(f"{count:>6} {blocks:>7} {bootstrap:>12.2f} {replay:>9.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class _DictPatientNFT:
+    """Registry record layout before PatientNFT used __slots__, for comparison"""
+
+    def __init__(self, patient_id, wallet_address, metadata):
+        self.patient_id = patient_id
+        self.wallet_address = wallet_address
+        self.metadata = metadata
+        self.token_id = hashlib.sha256(f"{patient_id}_{wallet_address}_{time.time()}".encode()).hexdigest()[:16]
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+
+
+def benchmark_registry_memory():
+    """Bytes per NFT registry record, dict-based vs compact __slots__ records"""
+    print("\n=== NFT registry memory ===")
+
+    table = _scaled_patient_table(6_856)
+    hospitals = table['hospital'].tolist()
+    expiries = table['expiry_date_y'].tolist()
+
+    def build(record_class, rows):
+        registry = {}
+        for i in range(rows):
+            patient_id = f"P{i:07d}"
+            metadata = {
+                'patient_id': patient_id,
+                'data_hash': hashlib.sha256(patient_id.encode()).hexdigest(),
+                'allow_training': bool(i % 3),
+                'consent_timestamp': datetime.now().isoformat(),
+                'expiry_date': expiries[i % len(expiries)],
+                'hospital': hospitals[i % len(hospitals)],
+                'created_by': 'system'
+            }
+            wallet = "0x" + hashlib.sha256(f"patient_{patient_id}".encode()).hexdigest()[:40]
+            nft = record_class(patient_id, wallet, metadata)
+            registry[nft.token_id] = nft
+        return registry
+
+    print(f"{'rows':>9} {'layout':>8} {'MB':>9} {'bytes/NFT':>10}")
+    for rows, layouts in ((100_000, (_DictPatientNFT, PatientNFT)), (1_000_000, (PatientNFT,))):
+        for record_class in layouts:
+            gc.collect()
+            tracemalloc.start()
+            registry = build(record_class, rows)
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            label = 'dict' if record_class is _DictPatientNFT else 'slots'
+            print(f"{rows:>9} {label:>8} {used / 2 ** 20:>9.1f} {used / rows:>10.0f}")
+            del registry
+
+
+def benchmark_warm_start(rounds: int = 4):
+    """Convergence versus wall time of refit and warm-started local updates"""
+    print("\n=== Warm-started local training ===")
+
+    print(f"{'model':>14} {'update':>11} {'round':>6} {'wall s':>8} {'local fit s':>12} {'val acc':>8}")
+    for model_type in ('mlp', 'random_forest'):
+        for local_update in FederatedLearningServer.LOCAL_UPDATE_MODES:
+            server = FederatedLearningServer(executor='sequential', local_update=local_update, local_epochs=5)
+            for node_id, hospital_name, file_path in HOSPITAL_FILES[:4]:
+                server.register_node(node_id, hospital_name, file_path)
+
+            wall = 0.0
+            for round_num in range(rounds):
+                start = time.perf_counter()
+                result = server.training_round(model_type)
+                wall += time.perf_counter() - start
+                if not result['success']:
+                    print(f"{model_type:>14} {local_update:>11} failed: {result['message']}")
+                    break
+
+                round_result = result['round_result']
+                fit_seconds = sum(local['metrics']['fit_seconds'] for local in round_result['local_results'].values())
+                print(f"{model_type:>14} {local_update:>11} {round_num + 1:>6} {wall:>8.2f} "
+                      f"{fit_seconds:>12.2f} {round_result['global_accuracy']:>8.4f}")
+
+
+def benchmark_evaluation():
+    """Global model evaluation on cached node holdouts: cold vs cached, by batch size"""
+    print("\n=== Federated evaluation ===")
+
+    print(f"{'model':>14} {'batch':>6} {'cold s':>8} {'cached s':>9} {'rows/s':>9} {'rows':>6} {'accuracy':>9}")
+    for model_type in ('random_forest', 'mlp'):
+        server = FederatedLearningServer(local_update='warm_start', local_epochs=5)
+        for node_id, hospital_name, file_path in HOSPITAL_FILES:
+            server.register_node(node_id, hospital_name, file_path)
+        server.train(2, model_type)
+
+        for batch_size in (256, 4096):
+            server.evaluator.batch_size = batch_size
+            for node in server.nodes.values():
+                node._holdout_cache = None
+
+            start = time.perf_counter()
+            server.evaluate_global_model()
+            cold = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = server.evaluate_global_model()
+            cached = time.perf_counter() - start
+
+            report = result['evaluation']
+            print(f"{model_type:>14} {batch_size:>6} {cold:>8.3f} {cached:>9.3f} {report['rows_per_second']:>9.0f} "
+                  f"{result['total_samples']:>6} {result['global_accuracy']:>9.4f}")
+
+
+def benchmark_federated_scaler():
+    """One-time federated scaler vs per-node refits, and agreement with a central fit"""
+    print("\n=== Federated scaler ===")
+
+    server = FederatedLearningServer(executor='sequential')
+    for node_id, hospital_name, file_path in HOSPITAL_FILES:
+        server.register_node(node_id, hospital_name, file_path)
+
+    start = time.perf_counter()
+    scaler = server.compute_global_scaler()
+    stats_seconds = time.perf_counter() - start
+
+    rows = pd.concat([node.training_rows()[FederatedModel.FEATURE_COLUMNS] for node in server.nodes.values()])
+    central = StandardScaler().fit(rows)
+    print(f"statistics pass: {stats_seconds * 1000:.1f} ms over {len(rows)} rows")
+    print(f"max |mean - central|: {np.max(np.abs(scaler.mean_ - central.mean_)):.2e}, "
+          f"max |scale - central|: {np.max(np.abs(scaler.scale_ - central.scale_)):.2e}")
+
+    # Spread of the per-node means the old per-node refits would have used
+    local_means = np.array([StandardScaler().fit(node.training_rows()[FederatedModel.FEATURE_COLUMNS]).mean_
+                            for node in server.nodes.values()])
+    spread = (local_means.max(axis=0) - local_means.min(axis=0)) / central.scale_
+    print(f"per-node refit mean spread (in global std units): max {spread.max():.3f}, mean {spread.mean():.3f}")
+
+
+BENCHMARKS = {
+    'forest_selection': benchmark_forest_selection,
+    'batch_consent': benchmark_batch_consent,
+    'mining': benchmark_mining,
+    'bulk_mint': benchmark_bulk_mint,
+    'registry_memory': benchmark_registry_memory,
+    'chain_restart': benchmark_chain_restart,
+    'warm_start': benchmark_warm_start,
+    'evaluation': benchmark_evaluation,
+    'federated_scaler': benchmark_federated_scaler,
+}
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (available: {', '.join(BENCHMARKS)})")
+            continue
+        BENCHMARKS[name]()
@@ -1,12 +1,170 @@
 
+import heapq
 import hashlib
 import json
+import os
+import sys
 import time
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import shutil
+import sqlite3
+import tempfile
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
 
 
+# Domain separation: a leaf hash can never be mistaken for an interior node
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+
+def hash_transaction(transaction: dict) -> str:
+    """Leaf hash of one transaction"""
+    return hashlib.sha256(_LEAF_PREFIX + json.dumps(transaction, sort_keys=True).encode()).hexdigest()
+
+
+def _hash_pair(left: str, right: str) -> str:
+    return hashlib.sha256(_NODE_PREFIX + (left + right).encode()).hexdigest()
+
+
+def _next_level(level: List[str]) -> List[str]:
+    # An odd last node is carried up unchanged rather than paired with itself,
+    # so duplicating the last transaction changes the root
+    parents = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(leaf_hashes: List[str]) -> str:
+    """Root of the Merkle tree over transaction hashes
+
+    An odd node at any level is promoted to the next level as is; an empty
+    block hashes the empty string.
+    """
+    if not leaf_hashes:
+        return hashlib.sha256(b"").hexdigest()
+
+    level = list(leaf_hashes)
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def merkle_proof(leaf_hashes: List[str], index: int) -> List[dict]:
+    """Sibling hashes from leaf to root, each tagged with the side it sits on
+
+    Levels where the node is promoted without a sibling add no step.
+    """
+    proof = []
+    level = list(leaf_hashes)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({'hash': level[sibling], 'position': 'left' if sibling < index else 'right'})
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf_hash: str, proof: List[dict], root: str) -> bool:
+    """Check a leaf against a Merkle root in O(log n) hashes"""
+    current = leaf_hash
+    for step in proof:
+        if step['position'] == 'left':
+            current = _hash_pair(step['hash'], current)
+        else:
+            current = _hash_pair(current, step['hash'])
+    return current == root
+
+
+def _patient_wallet_address(patient_id) -> str:
+    """Deterministic wallet address for a patient"""
+    return "0x" + hashlib.sha256(f"patient_{patient_id}".encode()).hexdigest()[:40]
+
+
+def _hash_patient_records(patient_ids: list, records: List[dict]) -> Tuple[List[str], List[str]]:
+    """Wallet addresses and data hashes for a chunk of patient records"""
+    wallets = [_patient_wallet_address(patient_id) for patient_id in patient_ids]
+    data_hashes = [hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest() for record in records]
+    return wallets, data_hashes
+
+
+def _search_nonce_range(header_prefix: bytes, start: int, stop: int, target: str) -> Optional[Tuple[int, str]]:
+    """Find the smallest nonce in [start, stop) whose header hash meets the target"""
+    prefix_hasher = hashlib.sha256(header_prefix)
+    difficulty = len(target)
+    for nonce in range(start, stop):
+        hasher = prefix_hasher.copy()
+        hasher.update(str(nonce).encode())
+        digest = hasher.hexdigest()
+        if digest[:difficulty] == target:
+            return nonce, digest
+    return None
+
+
+class ProofOfWorkMiner:
+    """Nonce search over a block's compact header, split across a process pool
+
+    The header is serialized once and only the nonce is appended per attempt.
+    Low difficulties are searched inline because the expected number of
+    attempts is far below what it costs to hand work to another process.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 50_000,
+                 parallel_threshold: int = 16 ** 4):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        """Stop the worker processes, if any were started"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def search(self, header_prefix: bytes, difficulty: int, start: int = 0) -> Tuple[int, str]:
+        """Return the smallest nonce >= start meeting the difficulty and its hash
+
+        Parallel rounds give every worker a contiguous nonce range and keep
+        the lowest hit, so the result matches a sequential search.
+        """
+        target = "0" * difficulty
+        if self.max_workers <= 1 or 16 ** difficulty < self.parallel_threshold:
+            while True:
+                found = _search_nonce_range(header_prefix, start, start + self.chunk_size, target)
+                if found:
+                    return found
+                start += self.chunk_size
+
+        executor = self._get_executor()
+        while True:
+            futures = [executor.submit(_search_nonce_range, header_prefix,
+                                       start + i * self.chunk_size, start + (i + 1) * self.chunk_size, target)
+                       for i in range(self.max_workers)]
+            hits = [found for found in (future.result() for future in futures) if found]
+            if hits:
+                return min(hits)
+            start += self.max_workers * self.chunk_size
+
+    def mine(self, block: 'Block', difficulty: int):
+        """Set the block's nonce and hash to the first solution for the difficulty"""
+        block.nonce, block.hash = self.search(block.header_prefix(), difficulty)
+
+
+_default_miner = ProofOfWorkMiner()
+
+
 class Block:
     """Individual block in the blockchain"""
 
@@ -15,28 +173,74 @@ class Block:
         self.transactions = transactions
         self.timestamp = timestamp
         self.previous_hash = previous_hash
+        self.transaction_hashes = [hash_transaction(transaction) for transaction in transactions]
+        self.merkle_root = merkle_root(self.transaction_hashes)
+        self.transaction_count = len(transactions)
         self.nonce = 0
         self.hash = self.calculate_hash()
 
+    def header_prefix(self) -> bytes:
+        """Compact header serialization; the nonce is appended to it when hashing"""
+        return (f"{self.index}:{self.previous_hash}:{self.timestamp!r}:{self.merkle_root}:"
+                f"{self.transaction_count}:").encode()
+
     def calculate_hash(self) -> str:
-        """Calculate the hash of the block"""
-        block_string = json.dumps({
-            'index': self.index,
-            'transactions': self.transactions,
-            'timestamp': self.timestamp,
-            'previous_hash': self.previous_hash,
-            'nonce': self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        """Calculate the hash of the block header"""
+        return hashlib.sha256(self.header_prefix() + str(self.nonce).encode()).hexdigest()
+
+    def has_valid_merkle_root(self) -> bool:
+        """Check that the transactions still match the count and root in the header"""
+        if len(self.transactions) != self.transaction_count:
+            return False
+        return merkle_root([hash_transaction(transaction) for transaction in self.transactions]) == self.merkle_root
+
+    def get_transaction_proof(self, tx_index: int) -> dict:
+        """Inclusion proof for one transaction against this block's header"""
+        return {
+            'block_index': self.index,
+            'block_hash': self.hash,
+            'merkle_root': self.merkle_root,
+            'transaction_count': self.transaction_count,
+            'tx_index': tx_index,
+            'tx_hash': self.transaction_hashes[tx_index],
+            'proof': merkle_proof(self.transaction_hashes, tx_index)
+        }
 
-    def mine_block(self, difficulty: int = 1):
+    def mine_block(self, difficulty: int = 1, miner: Optional[ProofOfWorkMiner] = None):
         """Simple proof-of-work mining"""
-        target = "0" * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        (miner or _default_miner).mine(self, difficulty)
         print(f"Block mined: {self.hash}")
 
+    @classmethod
+    def from_dict(cls, data: dict, transaction_hashes: Optional[List[str]] = None) -> 'Block':
+        """Rebuild a stored block as-is, without recomputing its hash"""
+        block = cls.__new__(cls)
+        block.index = data['index']
+        block.transactions = data['transactions']
+        block.timestamp = data['timestamp']
+        block.previous_hash = data['previous_hash']
+        block.transaction_hashes = (transaction_hashes if transaction_hashes is not None
+                                    else [hash_transaction(transaction) for transaction in block.transactions])
+        block.merkle_root = data['merkle_root']
+        # Stores written before the count was part of the header do not have it
+        count = data.get('transaction_count')
+        block.transaction_count = len(block.transactions) if count is None else count
+        block.nonce = data['nonce']
+        block.hash = data['hash']
+        return block
+
+    def to_summary(self) -> dict:
+        """Block header and transaction count, without the transaction bodies"""
+        return {
+            'index': self.index,
+            'timestamp': self.timestamp,
+            'previous_hash': self.previous_hash,
+            'merkle_root': self.merkle_root,
+            'nonce': self.nonce,
+            'hash': self.hash,
+            'transaction_count': self.transaction_count
+        }
+
     def to_dict(self) -> dict:
         """Convert block to dictionary"""
         return {
@@ -44,13 +248,82 @@ class Block:
             'transactions': self.transactions,
             'timestamp': self.timestamp,
             'previous_hash': self.previous_hash,
+            'merkle_root': self.merkle_root,
+            'transaction_count': self.transaction_count,
             'nonce': self.nonce,
             'hash': self.hash
         }
 
 
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING = object()
+
+
+class _SpaceSeparatedTimestamp(int):
+    """Packed timestamp whose original string used ' ' instead of 'T'"""
+    __slots__ = ()
+
+
+def _pack_timestamp(value):
+    """ISO timestamp string -> int microseconds since the epoch (exact round trip)
+
+    Only strings in isoformat()'s own form, with a 'T' or ' ' separator,
+    are packed; anything else (dates, offsets, other precisions) is kept
+    as the original string so unpacking always returns it unchanged.
+    """
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if parsed.tzinfo is None:
+            micros = (parsed - _EPOCH) // _MICROSECOND
+            if value == parsed.isoformat():
+                return micros
+            if value == parsed.isoformat(sep=' '):
+                return _SpaceSeparatedTimestamp(micros)
+    return value
+
+
+def _unpack_timestamp(value):
+    if type(value) is int:
+        return (_EPOCH + value * _MICROSECOND).isoformat()
+    if type(value) is _SpaceSeparatedTimestamp:
+        return (_EPOCH + value * _MICROSECOND).isoformat(sep=' ')
+    return value
+
+
+def _expiry_epoch(expiry_date) -> Optional[float]:
+    """POSIX time an expiry date falls on, or None when there is no expiry
+
+    A present but unparseable date gives -inf, so the consent reads as
+    expired (as in ConsentView) rather than never expiring.
+    """
+    if expiry_date is None or expiry_date is _MISSING or expiry_date == '' or pd.isna(expiry_date):
+        return None
+    if isinstance(expiry_date, datetime):
+        return expiry_date.timestamp()
+    try:
+        return datetime.fromisoformat(expiry_date.replace('Z', '')).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return float('-inf')
+
+
 class PatientNFT:
-    """NFT representation of patient data ownership"""
+    """NFT representation of patient data ownership
+
+    Records use __slots__ and keep metadata packed into typed fields:
+    timestamps as integer microseconds, the data hash as 32 raw bytes,
+    repeated strings (hospital, expiry date) interned, and the expiry also
+    as a POSIX time so consent checks never re-parse dates. The metadata
+    property rebuilds the original dict on demand; change consent through
+    update_consent rather than by mutating that dict.
+    """
+
+    __slots__ = ('patient_id', 'wallet_address', 'token_id', '_created_at', '_updated_at',
+                 '_meta_patient_id', '_data_hash', '_allow_training', '_consent_timestamp',
+                 '_expiry_date', 'expiry_epoch', '_hospital', '_created_by', '_extra_metadata')
 
     def __init__(self, patient_id: str, wallet_address: str, metadata: dict):
         self.patient_id = patient_id
@@ -60,6 +333,75 @@ class PatientNFT:
         self.created_at = datetime.now().isoformat()
         self.updated_at = self.created_at
 
+    @property
+    def created_at(self) -> str:
+        return _unpack_timestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value: str):
+        self._created_at = _pack_timestamp(value)
+
+    @property
+    def updated_at(self) -> str:
+        return _unpack_timestamp(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value: str):
+        self._updated_at = _pack_timestamp(value)
+
+    @property
+    def allow_training(self) -> bool:
+        return self._allow_training is not _MISSING and bool(self._allow_training)
+
+    @property
+    def metadata(self) -> dict:
+        """Metadata as a plain dict, in the order it was supplied for the standard fields"""
+        metadata = {}
+        if self._meta_patient_id is not _MISSING:
+            metadata['patient_id'] = self._meta_patient_id
+        if self._data_hash is not _MISSING:
+            metadata['data_hash'] = self._data_hash.hex() if isinstance(self._data_hash, bytes) else self._data_hash
+        if self._allow_training is not _MISSING:
+            metadata['allow_training'] = self._allow_training
+        if self._consent_timestamp is not _MISSING:
+            metadata['consent_timestamp'] = _unpack_timestamp(self._consent_timestamp)
+        if self._expiry_date is not _MISSING:
+            metadata['expiry_date'] = self._expiry_date
+        if self._hospital is not _MISSING:
+            metadata['hospital'] = self._hospital
+        if self._created_by is not _MISSING:
+            metadata['created_by'] = self._created_by
+        if self._extra_metadata:
+            metadata.update(self._extra_metadata)
+        return metadata
+
+    @metadata.setter
+    def metadata(self, metadata: dict):
+        metadata = dict(metadata)
+        self._meta_patient_id = metadata.pop('patient_id', _MISSING)
+
+        data_hash = metadata.pop('data_hash', _MISSING)
+        if isinstance(data_hash, str) and len(data_hash) == 64:
+            try:
+                data_hash = bytes.fromhex(data_hash)
+            except ValueError:
+                pass
+        self._data_hash = data_hash
+
+        self._allow_training = metadata.pop('allow_training', _MISSING)
+        self._consent_timestamp = _pack_timestamp(metadata.pop('consent_timestamp', _MISSING))
+
+        expiry_date = metadata.pop('expiry_date', _MISSING)
+        self._expiry_date = sys.intern(expiry_date) if isinstance(expiry_date, str) else expiry_date
+        self.expiry_epoch = _expiry_epoch(expiry_date)
+
+        hospital = metadata.pop('hospital', _MISSING)
+        self._hospital = sys.intern(hospital) if isinstance(hospital, str) else hospital
+        created_by = metadata.pop('created_by', _MISSING)
+        self._created_by = sys.intern(created_by) if isinstance(created_by, str) else created_by
+
+        self._extra_metadata = metadata or None
+
     def generate_token_id(self) -> str:
         """Generate unique token ID for the NFT"""
         token_string = f"{self.patient_id}_{self.wallet_address}_{time.time()}"
@@ -67,25 +409,35 @@ class PatientNFT:
 
     def update_consent(self, allow_training: bool, expiry_date: Optional[str] = None):
         """Update consent status in NFT metadata"""
-        self.metadata['allow_training'] = allow_training
-        self.metadata['consent_timestamp'] = datetime.now().isoformat()
+        self._allow_training = allow_training
+        self._consent_timestamp = _pack_timestamp(datetime.now().isoformat())
         if expiry_date:
-            self.metadata['expiry_date'] = expiry_date
+            self._expiry_date = sys.intern(expiry_date) if isinstance(expiry_date, str) else expiry_date
+            self.expiry_epoch = _expiry_epoch(expiry_date)
         self.updated_at = datetime.now().isoformat()
 
     def is_consent_valid(self) -> Tuple[bool, str]:
         """Check if consent is currently valid"""
-        if not self.metadata.get('allow_training', False):
+        if not self.allow_training:
             return False, "Consent not granted"
 
-        expiry_date = self.metadata.get('expiry_date')
-        if expiry_date:
-            expiry = datetime.fromisoformat(expiry_date.replace('Z', ''))
-            if expiry <= datetime.now():
-                return False, "Consent expired"
+        if self.expiry_epoch is not None and self.expiry_epoch <= time.time():
+            return False, "Consent expired"
 
         return True, "Valid consent"
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PatientNFT':
+        """Rebuild a stored NFT, keeping its original token ID"""
+        nft = cls.__new__(cls)
+        nft.patient_id = data['patient_id']
+        nft.wallet_address = data['wallet_address']
+        nft.metadata = data['metadata']
+        nft.token_id = data['token_id']
+        nft.created_at = data['created_at']
+        nft.updated_at = data['updated_at']
+        return nft
+
     def to_dict(self) -> dict:
         """Convert NFT to dictionary"""
         return {
@@ -98,18 +450,263 @@ class PatientNFT:
         }
 
 
+def _log_time(entry: dict) -> float:
+    """POSIX time of a log entry; entries without a parseable timestamp sort first"""
+    try:
+        return datetime.fromisoformat(entry['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+class ConsentAuditLog:
+    """Append-only consent audit log kept as fixed-size, time-partitioned chunks
+
+    Entries accumulate in an in-memory chunk that is sealed when it reaches
+    chunk_size entries or when an entry falls into a new time bucket. Sealed
+    chunks are spilled to NDJSON files under spill_dir (a temporary directory
+    by default), so memory holds only the open chunk plus per-chunk time
+    bounds and a patient_id/token_id -> chunk index. Queries read only the
+    chunks that can contain matches and stream them line by line.
+    """
+
+    def __init__(self, chunk_size: int = 10_000, bucket_seconds: int = 3600, spill_dir: Optional[str] = None):
+        self.chunk_size = chunk_size
+        self.bucket_seconds = bucket_seconds
+        self.spill_dir = spill_dir
+        self.chunks: List[dict] = []
+        self.patient_chunks: Dict[str, List[int]] = {}
+        self.token_chunks: Dict[str, List[int]] = {}
+        self._active: List[dict] = []
+        self._active_bucket = None
+        self._active_bounds = (float('inf'), float('-inf'))
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        return self.entries_since(0)
+
+    def _spill_path(self, chunk_id: int) -> str:
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='consent_audit_')
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        os.makedirs(self.spill_dir, exist_ok=True)
+        return os.path.join(self.spill_dir, f"chunk_{chunk_id:06d}.ndjson")
+
+    def _seal(self):
+        if not self._active:
+            return
+        chunk_id = len(self.chunks)
+        path = self._spill_path(chunk_id)
+        with open(path, 'w') as fh:
+            for entry in self._active:
+                fh.write(json.dumps(entry, default=_json_default) + '\n')
+
+        self.chunks.append({
+            'id': chunk_id,
+            'start_seq': self._length - len(self._active),
+            'count': len(self._active),
+            'first_time': self._active_bounds[0],
+            'last_time': self._active_bounds[1],
+            'path': path
+        })
+        self._active = []
+        self._active_bucket = None
+        self._active_bounds = (float('inf'), float('-inf'))
+
+    def append(self, entry: dict):
+        """Add one entry, sealing the open chunk first if it is full or from an earlier bucket"""
+        logged_at = _log_time(entry)
+        bucket = int(logged_at // self.bucket_seconds)
+        if self._active and (len(self._active) >= self.chunk_size or bucket != self._active_bucket):
+            self._seal()
+
+        chunk_id = len(self.chunks)
+        for key, index in (('patient_id', self.patient_chunks), ('token_id', self.token_chunks)):
+            value = entry.get(key)
+            if value is not None:
+                chunk_ids = index.setdefault(value, [])
+                if not chunk_ids or chunk_ids[-1] != chunk_id:
+                    chunk_ids.append(chunk_id)
+
+        self._active.append(entry)
+        self._active_bucket = bucket
+        self._active_bounds = (min(self._active_bounds[0], logged_at), max(self._active_bounds[1], logged_at))
+        self._length += 1
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def clear(self):
+        """Drop every entry and delete the spilled chunk files"""
+        for chunk in self.chunks:
+            try:
+                os.remove(chunk['path'])
+            except OSError:
+                pass
+        self.chunks = []
+        self.patient_chunks = {}
+        self.token_chunks = {}
+        self._active = []
+        self._active_bucket = None
+        self._active_bounds = (float('inf'), float('-inf'))
+        self._length = 0
+
+    def _read_chunk(self, chunk: dict):
+        with open(chunk['path']) as fh:
+            for line in fh:
+                yield json.loads(line)
+
+    def entries_since(self, seq: int):
+        """Yield entries from sequence number seq onwards, in append order"""
+        for chunk in self.chunks:
+            if chunk['start_seq'] + chunk['count'] <= seq:
+                continue
+            skip = max(0, seq - chunk['start_seq'])
+            for i, entry in enumerate(self._read_chunk(chunk)):
+                if i >= skip:
+                    yield entry
+        active_start = self._length - len(self._active)
+        yield from self._active[max(0, seq - active_start):]
+
+    def query(self, start: Optional[str] = None, end: Optional[str] = None, patient_id: Optional[str] = None,
+              token_id: Optional[str] = None, action: Optional[str] = None,
+              patient_ids: Optional[Set[str]] = None):
+        """Iterate over entries matching every given filter, in append order
+
+        start and end bound the entry timestamp (inclusive, ISO format);
+        patient_ids restricts entries to a set of patients. The sealed chunks
+        and open entries are snapshotted when query is called, so entries
+        appended while the result is consumed are neither skipped nor
+        repeated; they simply are not part of it. Bad filters raise here.
+        """
+        chunks = list(self.chunks)
+        active = list(self._active)
+
+        start_time = datetime.fromisoformat(start).timestamp() if start else float('-inf')
+        end_time = datetime.fromisoformat(end).timestamp() if end else float('inf')
+
+        # Chunks named by the patient/token index, or all of them
+        candidates = None
+        for value, index in ((patient_id, self.patient_chunks), (token_id, self.token_chunks)):
+            if value is not None:
+                chunk_ids = set(index.get(value, ()))
+                candidates = chunk_ids if candidates is None else candidates & chunk_ids
+        if patient_ids is not None:
+            chunk_ids = {chunk_id for pid in patient_ids for chunk_id in self.patient_chunks.get(pid, ())}
+            candidates = chunk_ids if candidates is None else candidates & chunk_ids
+
+        def matches(entry):
+            return ((patient_id is None or entry.get('patient_id') == patient_id)
+                    and (patient_ids is None or entry.get('patient_id') in patient_ids)
+                    and (token_id is None or entry.get('token_id') == token_id)
+                    and (action is None or entry.get('action') == action)
+                    and start_time <= _log_time(entry) <= end_time)
+
+        def scan():
+            for chunk in chunks:
+                if candidates is not None and chunk['id'] not in candidates:
+                    continue
+                if chunk['last_time'] < start_time or chunk['first_time'] > end_time:
+                    continue
+                yield from filter(matches, self._read_chunk(chunk))
+
+            if candidates is None or len(chunks) in candidates:
+                yield from filter(matches, active)
+
+        return scan()
+
+    def export_ndjson(self, **filters):
+        """Stream matching entries as NDJSON lines (snapshotted when called, see query)"""
+        return (json.dumps(entry, default=_json_default) + '\n' for entry in self.query(**filters))
+
+
 class SmartContract:
     """Smart contract for consent management"""
 
-    def __init__(self, contract_address: str):
+    def __init__(self, contract_address: str, audit_spill_dir: Optional[str] = None):
         self.contract_address = contract_address
         self.nft_registry: Dict[str, PatientNFT] = {}
-        self.consent_logs: List[dict] = []
+        self.consent_logs = ConsentAuditLog(spill_dir=audit_spill_dir)
+
+        # Secondary indexes over nft_registry, maintained on mint and transfer
+        self.patient_index: Dict[str, str] = {}
+        self.wallet_index: Dict[str, Set[str]] = {}
+
+        # Tokens changed since the registry was last persisted
+        self.dirty_tokens: Set[str] = set()
+
+        # Incremental consent statistics. expired_count covers granted NFTs whose
+        # expiry is at or before _stats_clock; later expiries wait in a min-heap
+        # and are counted lazily as the clock passes them.
+        self._granted_count = 0
+        self._expired_count = 0
+        self._stats_clock = time.time()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expiry_schedule: Dict[str, float] = {}
+
+    def _count_consent(self, nft: PatientNFT, delta: int):
+        """Add (delta=1) or remove (delta=-1) an NFT's contribution to the statistics"""
+        if not nft.allow_training:
+            return
+        self._granted_count += delta
+
+        expiry = nft.expiry_epoch
+        if expiry is None:
+            return
+        if expiry <= self._stats_clock:
+            self._expired_count += delta
+        elif delta > 0:
+            self._expiry_schedule[nft.token_id] = expiry
+            heapq.heappush(self._expiry_heap, (expiry, nft.token_id))
+        else:
+            # The heap entry goes stale and is skipped when popped
+            self._expiry_schedule.pop(nft.token_id, None)
+
+    def _advance_stats_clock(self, now: float):
+        """Count every scheduled expiry that has passed by now"""
+        self._stats_clock = now
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expiry, token_id = heapq.heappop(heap)
+            if self._expiry_schedule.get(token_id) == expiry:
+                del self._expiry_schedule[token_id]
+                self._expired_count += 1
+
+        # Drop stale entries once they outnumber the live ones
+        if len(heap) > 2 * len(self._expiry_schedule) + 1024:
+            self._expiry_heap = [(expiry, token_id) for token_id, expiry in self._expiry_schedule.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _rebuild_consent_statistics(self):
+        self._granted_count = 0
+        self._expired_count = 0
+        self._stats_clock = time.time()
+        self._expiry_schedule = {}
+        for nft in self.nft_registry.values():
+            if not nft.allow_training:
+                continue
+            self._granted_count += 1
+            if nft.expiry_epoch is None:
+                continue
+            if nft.expiry_epoch <= self._stats_clock:
+                self._expired_count += 1
+            else:
+                self._expiry_schedule[nft.token_id] = nft.expiry_epoch
+        self._expiry_heap = [(expiry, token_id) for token_id, expiry in self._expiry_schedule.items()]
+        heapq.heapify(self._expiry_heap)
 
     def mint_nft(self, patient_id: str, wallet_address: str, metadata: dict) -> str:
         """Mint a new patient NFT"""
         nft = PatientNFT(patient_id, wallet_address, metadata)
         self.nft_registry[nft.token_id] = nft
+        # The first token minted for a patient stays the one lookups resolve to
+        self.patient_index.setdefault(patient_id, nft.token_id)
+        self.wallet_index.setdefault(wallet_address, set()).add(nft.token_id)
+        self.dirty_tokens.add(nft.token_id)
+        self._count_consent(nft, 1)
 
         # Log the minting transaction
         self.consent_logs.append({
@@ -122,15 +719,48 @@ class SmartContract:
 
         return nft.token_id
 
+    def mint_nfts(self, patient_ids: list, wallet_addresses: List[str], metadatas: List[dict]) -> List[str]:
+        """Mint a batch of patient NFTs with one shared creation time"""
+        created_at = datetime.now().isoformat()
+        minted_at = time.time()
+
+        token_ids = []
+        for index, (patient_id, wallet_address, metadata) in enumerate(zip(patient_ids, wallet_addresses, metadatas)):
+            # The row index keeps repeated patients in one batch from sharing a token_id
+            token_id = hashlib.sha256(f"{patient_id}_{wallet_address}_{minted_at}_{index}".encode()).hexdigest()[:16]
+            nft = PatientNFT.from_dict({'token_id': token_id, 'patient_id': patient_id,
+                                        'wallet_address': wallet_address, 'metadata': metadata,
+                                        'created_at': created_at, 'updated_at': created_at})
+            self.nft_registry[token_id] = nft
+            self.patient_index.setdefault(patient_id, token_id)
+            self.wallet_index.setdefault(wallet_address, set()).add(token_id)
+            self._count_consent(nft, 1)
+            token_ids.append(token_id)
+
+        self.dirty_tokens.update(token_ids)
+        self.consent_logs.extend({
+            'action': 'mint',
+            'token_id': token_id,
+            'patient_id': patient_id,
+            'wallet_address': wallet_address,
+            'timestamp': created_at
+        } for token_id, patient_id, wallet_address in zip(token_ids, patient_ids, wallet_addresses))
+
+        return token_ids
+
     def update_consent(self, token_id: str, allow_training: bool, expiry_date: Optional[str] = None) -> bool:
         """Update consent for an NFT"""
         if token_id not in self.nft_registry:
             return False
 
         nft = self.nft_registry[token_id]
-        old_consent = nft.metadata.get('allow_training', False)
+        old_consent = nft.allow_training
 
+        self._advance_stats_clock(time.time())
+        self._count_consent(nft, -1)
         nft.update_consent(allow_training, expiry_date)
+        self._count_consent(nft, 1)
+        self.dirty_tokens.add(token_id)
 
         # Log the consent update
         self.consent_logs.append({
@@ -145,16 +775,63 @@ class SmartContract:
 
         return True
 
+    def transfer_nft(self, token_id: str, new_wallet_address: str) -> bool:
+        """Transfer an NFT to another wallet"""
+        if token_id not in self.nft_registry:
+            return False
+
+        nft = self.nft_registry[token_id]
+        old_wallet = nft.wallet_address
+
+        tokens = self.wallet_index.get(old_wallet)
+        if tokens is not None:
+            tokens.discard(token_id)
+            if not tokens:
+                del self.wallet_index[old_wallet]
+        self.wallet_index.setdefault(new_wallet_address, set()).add(token_id)
+
+        nft.wallet_address = new_wallet_address
+        nft.updated_at = datetime.now().isoformat()
+        self.dirty_tokens.add(token_id)
+
+        self.consent_logs.append({
+            'action': 'transfer',
+            'token_id': token_id,
+            'patient_id': nft.patient_id,
+            'from_wallet': old_wallet,
+            'to_wallet': new_wallet_address,
+            'timestamp': datetime.now().isoformat()
+        })
+
+        return True
+
+    def load_registry(self, nfts: List[PatientNFT], consent_logs: Iterable[dict]):
+        """Replace the registry and logs with stored state and rebuild the indexes"""
+        self.nft_registry = {nft.token_id: nft for nft in nfts}
+        self.consent_logs.clear()
+        self.consent_logs.extend(consent_logs)
+        self.patient_index = {}
+        self.wallet_index = {}
+        for nft in nfts:
+            self.patient_index.setdefault(nft.patient_id, nft.token_id)
+            self.wallet_index.setdefault(nft.wallet_address, set()).add(nft.token_id)
+        self.dirty_tokens = set()
+        self._rebuild_consent_statistics()
+
     def get_nft(self, token_id: str) -> Optional[PatientNFT]:
         """Get NFT by token ID"""
         return self.nft_registry.get(token_id)
 
     def get_nft_by_patient(self, patient_id: str) -> Optional[PatientNFT]:
         """Get NFT by patient ID"""
-        for nft in self.nft_registry.values():
-            if nft.patient_id == patient_id:
-                return nft
-        return None
+        token_id = self.patient_index.get(patient_id)
+        if token_id is None:
+            return None
+        return self.nft_registry.get(token_id)
+
+    def get_nfts_by_wallet(self, wallet_address: str) -> List[PatientNFT]:
+        """Get all NFTs held by a wallet"""
+        return [self.nft_registry[token_id] for token_id in self.wallet_index.get(wallet_address, ())]
 
     def verify_consent(self, patient_id: str) -> Tuple[bool, str]:
         """Verify patient consent for training"""
@@ -164,18 +841,40 @@ class SmartContract:
 
         return nft.is_consent_valid()
 
+    def verify_consents(self, patient_ids: List[str]) -> List[Tuple[bool, str]]:
+        """Verify consent for a whole cohort at once
+
+        Gives the same answers as verify_consent for each patient, but reads
+        the registry in one pass and compares all expiry times at once.
+        """
+        registry = self.nft_registry
+        nfts = [registry[token_id] if token_id is not None else None
+                for token_id in map(self.patient_index.get, patient_ids)]
+
+        found = np.fromiter((nft is not None for nft in nfts), dtype=bool, count=len(nfts))
+        allowed = np.fromiter((nft is not None and nft.allow_training for nft in nfts), dtype=bool, count=len(nfts))
+        expiry_epochs = np.fromiter((nft.expiry_epoch if nft is not None and nft.expiry_epoch is not None
+                                     else np.inf for nft in nfts), dtype=np.float64, count=len(nfts))
+        expired = expiry_epochs <= time.time()
+
+        reasons = np.where(~found, "NFT not found",
+                           np.where(~allowed, "Consent not granted",
+                                    np.where(expired, "Consent expired", "Valid consent")))
+        valid = found & allowed & ~expired
+
+        return list(zip(valid.tolist(), reasons.tolist()))
+
     def get_consent_statistics(self) -> dict:
-        """Get consent statistics across all NFTs"""
-        total_nfts = len(self.nft_registry)
-        consented_count = 0
-        expired_count = 0
+        """Get consent statistics across all NFTs
 
-        for nft in self.nft_registry.values():
-            is_valid, reason = nft.is_consent_valid()
-            if is_valid:
-                consented_count += 1
-            elif "expired" in reason.lower():
-                expired_count += 1
+        Served from running counters; only expiries passed since the last
+        call are processed.
+        """
+        self._advance_stats_clock(time.time())
+
+        total_nfts = len(self.nft_registry)
+        expired_count = self._expired_count
+        consented_count = self._granted_count - expired_count
 
         return {
             'total_nfts': total_nfts,
@@ -188,10 +887,30 @@ class SmartContract:
 class BlockchainNetwork:
     """Simulated blockchain network for NFT consent management"""
 
-    def __init__(self):
+    def __init__(self, difficulty: int = 2, miner: Optional[ProofOfWorkMiner] = None):
         self.chain: List[Block] = []
         self.pending_transactions: List[dict] = []
         self.smart_contracts: Dict[str, SmartContract] = {}
+        self.difficulty = difficulty
+        self.miner = miner or _default_miner
+        # token_id / patient_id -> (block index, transaction index) of every mined transaction for it
+        self.token_transactions: Dict[str, List[Tuple[int, int]]] = {}
+        self.patient_transactions: Dict[str, List[Tuple[int, int]]] = {}
+        self.block_hash_index: Dict[str, int] = {}
+
+        # Blocks up to this height have been validated and are not re-checked
+        self.validated_height = 0
+        self._validation_lock = threading.Lock()
+        self._verification_thread = None
+        self.verification_status = {
+            'running': False,
+            'checked': 0,
+            'total': 0,
+            'valid': None,
+            'invalid_block': None,
+            'started_at': None,
+            'finished_at': None
+        }
         self.create_genesis_block()
 
     def create_genesis_block(self):
@@ -199,6 +918,7 @@ class BlockchainNetwork:
         genesis_block = Block(0, [], time.time(), "0")
         genesis_block.hash = genesis_block.calculate_hash()
         self.chain.append(genesis_block)
+        self._index_block(genesis_block)
 
     def get_latest_block(self) -> Block:
         """Get the latest block in the chain"""
@@ -227,6 +947,13 @@ class BlockchainNetwork:
         transaction['timestamp'] = datetime.now().isoformat()
         self.pending_transactions.append(transaction)
 
+    def add_transactions(self, transactions: List[dict]):
+        """Add a batch of transactions to the pending pool with one shared timestamp"""
+        timestamp = datetime.now().isoformat()
+        for transaction in transactions:
+            transaction['timestamp'] = timestamp
+        self.pending_transactions.extend(transactions)
+
     def mine_pending_transactions(self, mining_reward_address: str = "system"):
         """Mine all pending transactions into a new block"""
         if not self.pending_transactions:
@@ -250,30 +977,197 @@ class BlockchainNetwork:
         )
 
         # Mine the block (simple proof-of-work)
-        new_block.mine_block(difficulty=2)
+        new_block.mine_block(difficulty=self.difficulty, miner=self.miner)
 
         # Add to chain and clear pending transactions
         self.chain.append(new_block)
         self.pending_transactions = []
 
+        self._index_block(new_block)
+
         return new_block
 
-    def is_chain_valid(self) -> bool:
-        """Validate the entire blockchain"""
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+    def _index_block(self, block: Block):
+        self.block_hash_index[block.hash] = block.index
+        for tx_index, transaction in enumerate(block.transactions):
+            if 'token_id' in transaction:
+                self.token_transactions.setdefault(transaction['token_id'], []).append((block.index, tx_index))
+            if 'patient_id' in transaction:
+                self.patient_transactions.setdefault(transaction['patient_id'], []).append((block.index, tx_index))
+
+    def load_chain(self, blocks: List[Block], pending_transactions: List[dict]):
+        """Replace the chain with stored blocks; they are re-validated lazily"""
+        self.chain = blocks
+        self.pending_transactions = pending_transactions
+        self.token_transactions = {}
+        self.patient_transactions = {}
+        self.block_hash_index = {}
+        for block in blocks:
+            self._index_block(block)
+        with self._validation_lock:
+            self.validated_height = 0
+
+    def _is_block_valid(self, i: int) -> bool:
+        current_block = self.chain[i]
+        previous_block = self.chain[i - 1]
+
+        # Check if current block's hash is valid
+        if current_block.hash != current_block.calculate_hash():
+            return False
 
-            # Check if current block's hash is valid
-            if current_block.hash != current_block.calculate_hash():
-                return False
+        # Check the header still commits to the block's transactions
+        if not current_block.has_valid_merkle_root():
+            return False
 
-            # Check if current block points to previous block
-            if current_block.previous_hash != previous_block.hash:
-                return False
+        # Check if current block points to previous block
+        return current_block.previous_hash == previous_block.hash
+
+    def is_chain_valid(self, full: bool = False) -> bool:
+        """Validate the blockchain
+
+        Only blocks appended since the last validated height are checked
+        unless full is set, in which case every block from genesis is.
+        """
+        with self._validation_lock:
+            height = len(self.chain) - 1
+            start = 1 if full else self.validated_height + 1
+            for i in range(start, height + 1):
+                if not self._is_block_valid(i):
+                    self.validated_height = min(self.validated_height, i - 1)
+                    return False
+                if i > self.validated_height:
+                    self.validated_height = i
+            return True
+
+    def start_full_verification(self) -> bool:
+        """Re-verify every block from genesis in a background thread
+
+        Progress is reported in verification_status. Returns False if a
+        verification is already running.
+        """
+        if self._verification_thread is not None and self._verification_thread.is_alive():
+            return False
 
+        self.verification_status.update({
+            'running': True,
+            'checked': 0,
+            'total': len(self.chain) - 1,
+            'valid': None,
+            'invalid_block': None,
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None
+        })
+        self._verification_thread = threading.Thread(target=self._run_full_verification, daemon=True,
+                                                     name='ChainVerifier')
+        self._verification_thread.start()
         return True
 
+    def _run_full_verification(self):
+        status = self.verification_status
+        valid = True
+        # Validate without holding the lock so incremental checks and mining continue meanwhile
+        for i in range(1, status['total'] + 1):
+            if not self._is_block_valid(i):
+                valid = False
+                status['invalid_block'] = i
+                with self._validation_lock:
+                    self.validated_height = min(self.validated_height, i - 1)
+                break
+            status['checked'] = i
+
+        if valid:
+            with self._validation_lock:
+                self.validated_height = max(self.validated_height, status['total'])
+
+        status.update({
+            'running': False,
+            'valid': valid,
+            'finished_at': datetime.now().isoformat()
+        })
+
+    def get_block(self, height: int) -> Optional[Block]:
+        """Block at a height, or None"""
+        if 0 <= height < len(self.chain):
+            return self.chain[height]
+        return None
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """Block with the given hash, or None"""
+        height = self.block_hash_index.get(block_hash)
+        return None if height is None else self.chain[height]
+
+    def get_blocks_page(self, cursor: Optional[int] = None, limit: int = 50, descending: bool = True,
+                        compact: bool = False) -> dict:
+        """One page of blocks starting at height cursor (inclusive)
+
+        Without a cursor, descending pages start at the chain tip and
+        ascending pages at genesis. next_cursor is None on the last page.
+        """
+        height = len(self.chain) - 1
+        if descending:
+            start = height if cursor is None else min(cursor, height)
+            heights = range(start, max(start - limit, -1), -1)
+            next_cursor = heights[-1] - 1 if heights and heights[-1] > 0 else None
+        else:
+            start = 0 if cursor is None else max(cursor, 0)
+            heights = range(start, min(start + limit, height + 1))
+            next_cursor = heights[-1] + 1 if heights and heights[-1] < height else None
+
+        blocks = [self.chain[i] for i in heights]
+        return {
+            'blocks': [block.to_summary() if compact else block.to_dict() for block in blocks],
+            'next_cursor': next_cursor,
+            'height': height
+        }
+
+    def find_transactions(self, token_id: Optional[str] = None, patient_id: Optional[str] = None,
+                          cursor: int = 0, limit: int = 50) -> dict:
+        """Mined transactions for a token or patient, oldest first, through the transaction indexes"""
+        if token_id is not None:
+            locations = self.token_transactions.get(token_id, [])
+            if patient_id is not None:
+                locations = [(b, t) for b, t in locations if self.chain[b].transactions[t].get('patient_id') == patient_id]
+        elif patient_id is not None:
+            locations = self.patient_transactions.get(patient_id, [])
+        else:
+            locations = []
+
+        page = locations[cursor:cursor + limit]
+        return {
+            'transactions': [{
+                'block_index': block_index,
+                'block_hash': self.chain[block_index].hash,
+                'tx_index': tx_index,
+                'transaction': self.chain[block_index].transactions[tx_index]
+            } for block_index, tx_index in page],
+            'next_cursor': cursor + limit if cursor + limit < len(locations) else None,
+            'total': len(locations)
+        }
+
+    def get_transaction_proof(self, block_index: int, tx_index: int) -> Optional[dict]:
+        """Inclusion proof for a mined transaction"""
+        if not 0 <= block_index < len(self.chain):
+            return None
+        block = self.chain[block_index]
+        if not 0 <= tx_index < len(block.transactions):
+            return None
+        return block.get_transaction_proof(tx_index)
+
+    def verify_transaction_inclusion(self, transaction: dict, proof: dict) -> bool:
+        """Check a transaction against a block header without touching its other transactions"""
+        if not 0 <= proof['block_index'] < len(self.chain):
+            return False
+
+        block = self.chain[proof['block_index']]
+        if block.merkle_root != proof['merkle_root'] or block.hash != block.calculate_hash():
+            return False
+        if proof.get('transaction_count', block.transaction_count) != block.transaction_count:
+            return False
+        if not 0 <= proof['tx_index'] < block.transaction_count:
+            return False
+
+        return verify_merkle_proof(hash_transaction(transaction), proof['proof'], block.merkle_root)
+
     def get_chain_info(self) -> dict:
         """Get information about the blockchain"""
         return {
@@ -281,15 +1175,155 @@ class BlockchainNetwork:
             'total_transactions': sum(len(block.transactions) for block in self.chain),
             'total_contracts': len(self.smart_contracts),
             'chain_valid': self.is_chain_valid(),
+            'validated_height': self.validated_height,
             'latest_block_hash': self.get_latest_block().hash,
             'pending_transactions': len(self.pending_transactions)
         }
 
 
+def _json_default(value):
+    # NumPy scalars from pandas rows keep their type; anything else is stored as text
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class ChainStore:
+    """SQLite persistence for the chain, NFT registry and consent logs
+
+    Blocks, consent logs and pending transactions are append-only tables
+    written incrementally; the registry table is a snapshot that only
+    rewrites tokens changed since the last save. Loading replays the tables
+    into memory without re-minting or re-mining, so token IDs and block
+    hashes are stable across restarts.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self._saved_height = -1
+        self._saved_logs = 0
+        self._saved_pending = 0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS blocks (
+                    height INTEGER PRIMARY KEY,
+                    timestamp REAL NOT NULL,
+                    previous_hash TEXT NOT NULL,
+                    merkle_root TEXT NOT NULL,
+                    nonce INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    transactions TEXT NOT NULL,
+                    transaction_hashes TEXT NOT NULL,
+                    transaction_count INTEGER
+                )
+            ''')
+            # Stores created before the header committed to the transaction count
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(blocks)')}
+            if 'transaction_count' not in columns:
+                self.conn.execute('ALTER TABLE blocks ADD COLUMN transaction_count INTEGER')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS nfts (
+                    token_id TEXT PRIMARY KEY,
+                    patient_id TEXT NOT NULL,
+                    wallet_address TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            ''')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS consent_logs (seq INTEGER PRIMARY KEY, entry TEXT NOT NULL)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS pending_transactions '
+                              '(seq INTEGER PRIMARY KEY, transaction_data TEXT NOT NULL)')
+
+    def save(self, blockchain: 'BlockchainNetwork', contract: SmartContract):
+        """Write everything changed since the last save in one transaction"""
+        with self.lock, self.conn:
+            new_blocks = blockchain.chain[self._saved_height + 1:]
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO blocks (height, timestamp, previous_hash, merkle_root, nonce, hash, '
+                'transactions, transaction_hashes, transaction_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(block.index, block.timestamp, block.previous_hash, block.merkle_root, block.nonce, block.hash,
+                  json.dumps(block.transactions, default=_json_default), json.dumps(block.transaction_hashes),
+                  block.transaction_count)
+                 for block in new_blocks]
+            )
+
+            dirty = [contract.nft_registry[token_id] for token_id in contract.dirty_tokens]
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO nfts VALUES (?, ?, ?, ?, ?, ?)',
+                [(nft.token_id, nft.patient_id, nft.wallet_address, json.dumps(nft.metadata, default=_json_default),
+                  nft.created_at, nft.updated_at) for nft in dirty]
+            )
+
+            self.conn.executemany(
+                'INSERT INTO consent_logs (seq, entry) VALUES (?, ?)',
+                ((self._saved_logs + i, json.dumps(entry, default=_json_default))
+                 for i, entry in enumerate(contract.consent_logs.entries_since(self._saved_logs)))
+            )
+
+            # Mining empties the pending pool, so after new blocks it is rewritten from scratch
+            if new_blocks:
+                self.conn.execute('DELETE FROM pending_transactions')
+                self._saved_pending = 0
+            self.conn.executemany(
+                'INSERT INTO pending_transactions (seq, transaction_data) VALUES (?, ?)',
+                [(self._saved_pending + i, json.dumps(transaction, default=_json_default))
+                 for i, transaction in enumerate(blockchain.pending_transactions[self._saved_pending:])]
+            )
+
+            contract.dirty_tokens.clear()
+            self._saved_height = len(blockchain.chain) - 1
+            self._saved_logs = len(contract.consent_logs)
+            self._saved_pending = len(blockchain.pending_transactions)
+
+    def load(self, blockchain: 'BlockchainNetwork', contract: SmartContract) -> bool:
+        """Replay stored state into the network and contract; False if nothing is stored"""
+        with self.lock:
+            block_rows = self.conn.execute(
+                'SELECT height, timestamp, previous_hash, merkle_root, nonce, hash, transactions, transaction_hashes, '
+                'transaction_count FROM blocks ORDER BY height'
+            ).fetchall()
+            if not block_rows:
+                return False
+            nft_rows = self.conn.execute(
+                'SELECT token_id, patient_id, wallet_address, metadata, created_at, updated_at FROM nfts ORDER BY rowid'
+            ).fetchall()
+            pending_rows = self.conn.execute('SELECT transaction_data FROM pending_transactions ORDER BY seq').fetchall()
+
+            blocks = [
+                Block.from_dict({'index': height, 'timestamp': timestamp, 'previous_hash': previous_hash,
+                                 'merkle_root': root, 'nonce': nonce, 'hash': block_hash,
+                                 'transactions': json.loads(transactions), 'transaction_count': count},
+                                json.loads(transaction_hashes))
+                for height, timestamp, previous_hash, root, nonce, block_hash, transactions, transaction_hashes, count
+                in block_rows
+            ]
+            nfts = [
+                PatientNFT.from_dict({'token_id': token_id, 'patient_id': patient_id,
+                                      'wallet_address': wallet_address, 'metadata': json.loads(metadata),
+                                      'created_at': created_at, 'updated_at': updated_at})
+                for token_id, patient_id, wallet_address, metadata, created_at, updated_at in nft_rows
+            ]
+
+            blockchain.load_chain(blocks, [json.loads(row[0]) for row in pending_rows])
+            # Logs stream straight into the chunked audit log rather than through a list
+            log_rows = self.conn.execute('SELECT entry FROM consent_logs ORDER BY seq')
+            contract.load_registry(nfts, (json.loads(row[0]) for row in log_rows))
+
+            self._saved_height = len(blocks) - 1
+            self._saved_logs = len(contract.consent_logs)
+            self._saved_pending = len(blockchain.pending_transactions)
+            return True
+
+
 class NFTConsentManager:
     """High-level manager for NFT-based consent using blockchain"""
 
-    def __init__(self):
+    def __init__(self, store_path: Optional[str] = None):
         self.blockchain = BlockchainNetwork()
         self.contract_address = "0x" + hashlib.sha256("PatientConsentContract".encode()).hexdigest()[:40]
 
@@ -297,22 +1331,42 @@ class NFTConsentManager:
         self.blockchain.deploy_smart_contract(self.contract_address)
         self.contract = self.blockchain.get_smart_contract(self.contract_address)
 
-    def create_patient_nft(self, patient_id: str, patient_data: dict) -> str:
-        """Create an NFT for patient data with consent metadata"""
-        # Generate wallet address for patient
-        wallet_address = "0x" + hashlib.sha256(f"patient_{patient_id}".encode()).hexdigest()[:40]
+        # Optional on-disk persistence; saves are deferred while bulk-loading
+        self.store = ChainStore(store_path) if store_path else None
+        self._bulk_loading = False
 
-        # Create NFT metadata based on patient data
-        metadata = {
+    def load_from_store(self) -> bool:
+        """Warm start from the persistent store; False if there is none or it is empty"""
+        if self.store is None:
+            return False
+        return self.store.load(self.blockchain, self.contract)
+
+    def persist(self):
+        """Save changes since the last save to the persistent store, if configured"""
+        if self.store is not None and not self._bulk_loading:
+            self.store.save(self.blockchain, self.contract)
+
+    @staticmethod
+    def _nft_metadata(patient_id, patient_data: dict, data_hash: str, consent_timestamp: str) -> dict:
+        return {
             'patient_id': patient_id,
-            'data_hash': hashlib.sha256(json.dumps(patient_data, sort_keys=True).encode()).hexdigest(),
+            'data_hash': data_hash,
             'allow_training': patient_data.get('allow_training', False),
-            'consent_timestamp': datetime.now().isoformat(),
+            'consent_timestamp': consent_timestamp,
             'expiry_date': patient_data.get('expiry_date'),
             'hospital': patient_data.get('hospital', 'Unknown'),
             'created_by': 'system'
         }
 
+    def create_patient_nft(self, patient_id: str, patient_data: dict) -> str:
+        """Create an NFT for patient data with consent metadata"""
+        # Generate wallet address for patient
+        wallet_address = _patient_wallet_address(patient_id)
+
+        # Create NFT metadata based on patient data
+        data_hash = hashlib.sha256(json.dumps(patient_data, sort_keys=True).encode()).hexdigest()
+        metadata = self._nft_metadata(patient_id, patient_data, data_hash, datetime.now().isoformat())
+
         # Mint NFT
         token_id = self.contract.mint_nft(patient_id, wallet_address, metadata)
 
@@ -324,9 +1378,53 @@ class NFTConsentManager:
             'token_id': token_id,
             'wallet_address': wallet_address
         })
+        self.persist()
 
         return token_id
 
+    def create_patient_nfts(self, patients: pd.DataFrame, block_size: int = 10,
+                            max_workers: Optional[int] = None, chunk_size: int = 50_000) -> List[str]:
+        """Mint NFTs for every row of a patient table in bulk
+
+        Produces the same wallets, data hashes and metadata as calling
+        create_patient_nft per row. Hashing can be spread over max_workers
+        processes; each block of block_size mints is submitted to the chain
+        as one transaction batch and mined.
+        """
+        patient_ids = patients['patient_id'].tolist()
+        records = patients.to_dict('records')
+
+        if max_workers and max_workers > 1 and len(records) > chunk_size:
+            bounds = range(0, len(records), chunk_size)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                chunks = list(executor.map(_hash_patient_records,
+                                           [patient_ids[i:i + chunk_size] for i in bounds],
+                                           [records[i:i + chunk_size] for i in bounds]))
+            wallets = [wallet for chunk_wallets, _ in chunks for wallet in chunk_wallets]
+            data_hashes = [data_hash for _, chunk_hashes in chunks for data_hash in chunk_hashes]
+        else:
+            wallets, data_hashes = _hash_patient_records(patient_ids, records)
+
+        consent_timestamp = datetime.now().isoformat()
+        metadatas = [self._nft_metadata(patient_id, record, data_hash, consent_timestamp)
+                     for patient_id, record, data_hash in zip(patient_ids, records, data_hashes)]
+        token_ids = self.contract.mint_nfts(patient_ids, wallets, metadatas)
+
+        for start in range(0, len(token_ids), block_size):
+            self.blockchain.add_transactions([{
+                'type': 'nft_mint',
+                'contract_address': self.contract_address,
+                'patient_id': patient_id,
+                'token_id': token_id,
+                'wallet_address': wallet_address
+            } for patient_id, token_id, wallet_address in zip(patient_ids[start:start + block_size],
+                                                              token_ids[start:start + block_size],
+                                                              wallets[start:start + block_size])])
+            self.blockchain.mine_pending_transactions()
+
+        self.persist()
+        return token_ids
+
     def update_patient_consent(self, patient_id: str, allow_training: bool, expiry_date: Optional[str] = None) -> bool:
         """Update patient consent through NFT"""
         nft = self.contract.get_nft_by_patient(patient_id)
@@ -346,13 +1444,88 @@ class NFTConsentManager:
                 'allow_training': allow_training,
                 'expiry_date': expiry_date
             })
+            self.persist()
 
         return success
 
+    def update_patient_consents(self, updates: List[dict]) -> dict:
+        """Apply many consent updates in one pass with a single batch of chain transactions
+
+        Each update is a dict with patient_id, allow_training and optionally
+        expiry_date. Returns the number applied and the patient IDs not found.
+        """
+        transactions = []
+        not_found = []
+        for update in updates:
+            nft = self.contract.get_nft_by_patient(update['patient_id'])
+            if nft is None:
+                not_found.append(update['patient_id'])
+                continue
+
+            self.contract.update_consent(nft.token_id, update['allow_training'], update.get('expiry_date'))
+            transactions.append({
+                'type': 'consent_update',
+                'contract_address': self.contract_address,
+                'patient_id': update['patient_id'],
+                'token_id': nft.token_id,
+                'allow_training': update['allow_training'],
+                'expiry_date': update.get('expiry_date')
+            })
+
+        self.blockchain.add_transactions(transactions)
+        self.persist()
+
+        return {
+            'updated': len(transactions),
+            'not_found': not_found
+        }
+
     def verify_patient_consent(self, patient_id: str) -> Tuple[bool, str]:
         """Verify if patient has valid consent for training"""
         return self.contract.verify_consent(patient_id)
 
+    def verify_patient_consents(self, patient_ids: List[str]) -> Dict[str, Tuple[bool, str]]:
+        """Verify consent for a training cohort, keyed by patient ID"""
+        return dict(zip(patient_ids, self.contract.verify_consents(patient_ids)))
+
+    def transfer_patient_nft(self, patient_id: str, new_wallet_address: str) -> bool:
+        """Transfer a patient's NFT to another wallet"""
+        nft = self.contract.get_nft_by_patient(patient_id)
+        if not nft:
+            return False
+
+        old_wallet = nft.wallet_address
+        success = self.contract.transfer_nft(nft.token_id, new_wallet_address)
+
+        if success:
+            self.blockchain.add_transaction({
+                'type': 'nft_transfer',
+                'contract_address': self.contract_address,
+                'patient_id': patient_id,
+                'token_id': nft.token_id,
+                'from_wallet': old_wallet,
+                'to_wallet': new_wallet_address
+            })
+            self.persist()
+
+        return success
+
+    def get_consent_proof(self, patient_id: str) -> Optional[dict]:
+        """Inclusion proof for the patient's most recent mined consent transaction"""
+        nft = self.contract.get_nft_by_patient(patient_id)
+        if not nft:
+            return None
+
+        for block_index, tx_index in reversed(self.blockchain.token_transactions.get(nft.token_id, [])):
+            transaction = self.blockchain.chain[block_index].transactions[tx_index]
+            if transaction['type'] in ('consent_update', 'nft_mint'):
+                proof = self.blockchain.get_transaction_proof(block_index, tx_index)
+                proof['transaction'] = transaction
+                proof['verified'] = self.blockchain.verify_transaction_inclusion(transaction, proof)
+                return proof
+
+        return None
+
     def get_patient_nft_info(self, patient_id: str) -> Optional[dict]:
         """Get patient NFT information"""
         nft = self.contract.get_nft_by_patient(patient_id)
@@ -374,6 +1547,7 @@ class NFTConsentManager:
     def mine_transactions(self) -> Optional[dict]:
         """Mine pending transactions into blockchain"""
         block = self.blockchain.mine_pending_transactions()
+        self.persist()
         if block:
             return block.to_dict()
         return None
@@ -390,12 +1564,22 @@ class NFTConsentManager:
             'system_status': 'operational'
         }
 
-    def export_audit_log(self) -> List[dict]:
-        """Export complete audit log of all consent transactions"""
-        return self.contract.consent_logs
+    def export_audit_log(self, **filters) -> List[dict]:
+        """Export the audit log of consent transactions, optionally filtered
+
+        Accepts the filters of ConsentAuditLog.query. Use stream_audit_log
+        for large exports.
+        """
+        return list(self.contract.consent_logs.query(**filters))
+
+    def stream_audit_log(self, **filters):
+        """Stream the audit log as NDJSON lines at constant memory"""
+        return self.contract.consent_logs.export_ndjson(**filters)
 
-    def initialize_from_csv_data(self, patient_csv_path: str, nft_csv_path: str) -> int:
+    def initialize_from_csv_data(self, patient_csv_path: str, nft_csv_path: str,
+                                 max_workers: Optional[int] = None) -> int:
         """Initialize NFTs from existing CSV data"""
+        self._bulk_loading = True
         try:
             patient_df = pd.read_csv(patient_csv_path)
             nft_df = pd.read_csv(nft_csv_path)
@@ -403,26 +1587,20 @@ class NFTConsentManager:
             # Merge data
             merged_df = patient_df.merge(nft_df, on='patient_id', how='left')
 
-            created_count = 0
-            for i, (_, row) in enumerate(merged_df.iterrows()):
-                patient_data = row.to_dict()
-                token_id = self.create_patient_nft(row['patient_id'], patient_data)
-                if token_id:
-                    created_count += 1
-                
-                # Mine a block every 10 transactions to create a realistic chain
-                if (i + 1) % 10 == 0:
-                    self.mine_transactions()
+            # Mine a block every 10 mints to create a realistic chain
+            token_ids = self.create_patient_nfts(merged_df, block_size=10, max_workers=max_workers)
 
-            # Mine remaining transactions
-            self.mine_transactions()
-
-            return created_count
+            return len(token_ids)
 
         except Exception as e:
             print(f"Error initializing from CSV: {e}")
             return 0
 
+        finally:
+            # One save for the whole bootstrap instead of one per mined block
+            self._bulk_loading = False
+            self.persist()
+
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -2,28 +2,486 @@
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score
 import joblib
 import json
 import os
+import copy
+import hashlib
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Union
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import threading
 import time
 
+from node_data_store import load_node_frame
+
+
+class ConsentView:
+    """Incrementally maintained consent filter over a node's data.
+
+    Expiry dates are parsed once into a sorted datetime64 index and the
+    consent state is kept as a boolean mask. Each refresh only touches rows
+    whose expiry passed since the previous call, and consent updates only
+    touch the affected row, so filtering costs O(changed rows).
+
+    Consent updates may arrive from request threads while training reads the
+    view, so every public method holds the view's lock.
+    """
+
+    # Rows without an expiry never expire; unparseable dates count as expired
+    NEVER_EXPIRES = np.iinfo(np.int64).max
+    ALWAYS_EXPIRED = np.iinfo(np.int64).min
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self.has_consent_column = 'allow_training' in data.columns
+        n = len(data)
+
+        self._allow = np.array(data['allow_training'] == True, dtype=bool) if self.has_consent_column else np.ones(n, dtype=bool)
+        self._expiry = self._parse_expiry(data['expiry_date']) if 'expiry_date' in data.columns else np.full(n, self.NEVER_EXPIRES, dtype=np.int64)
+        self._build_index()
+
+        self._positions = {pid: pos for pos, pid in enumerate(data['patient_id'])} if 'patient_id' in data.columns else {}
+        self._filtered = None
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def _parse_expiry(cls, expiry: pd.Series) -> np.ndarray:
+        """Parse expiry dates into int64 nanoseconds since the epoch"""
+        parsed = pd.to_datetime(expiry, errors='coerce')
+        values = parsed.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        values[parsed.isna().to_numpy()] = cls.ALWAYS_EXPIRED
+        values[expiry.isna().to_numpy()] = cls.NEVER_EXPIRES
+        return values
+
+    @staticmethod
+    def _now_ns(now: Optional[datetime] = None) -> int:
+        return int(np.datetime64(now or datetime.now(), 'ns').astype(np.int64))
+
+    def _build_index(self, now_ns: Optional[int] = None):
+        """Sort rows by expiry and evaluate the full mask once"""
+        self._order = np.argsort(self._expiry, kind='stable')
+        self._sorted_expiry = self._expiry[self._order]
+        # Rows whose expiry changed after the index was built are tracked separately
+        self._overrides: Dict[int, int] = {}
+        self._now = self._now_ns() if now_ns is None else now_ns
+        self._cursor = int(np.searchsorted(self._sorted_expiry, self._now, side='right'))
+        self._mask = self._allow & (self._expiry > self._now)
+        self.consented_count = int(self._mask.sum())
+
+    def refresh(self, now: Optional[datetime] = None) -> int:
+        """Expire rows whose expiry passed since the last refresh; returns rows changed"""
+        with self._lock:
+            return self._refresh(self._now_ns(now))
+
+    def _refresh(self, now_ns: int) -> int:
+        if now_ns < self._now:
+            # Clock moved backwards; the cursor cannot be rewound cheaply
+            self._build_index(now_ns)
+            self._filtered = None
+            return len(self._mask)
+
+        cursor = int(np.searchsorted(self._sorted_expiry, now_ns, side='right'))
+        newly_expired = self._order[self._cursor:cursor]
+        if self._overrides:
+            override_rows = np.fromiter(self._overrides.keys(), dtype=np.int64)
+            newly_expired = newly_expired[~np.isin(newly_expired, override_rows)]
+            newly_expired = np.concatenate([
+                newly_expired,
+                np.array([pos for pos, exp in self._overrides.items()
+                          if self._now < exp <= now_ns], dtype=np.int64)
+            ])
+
+        changed = int(self._mask[newly_expired].sum())
+        if changed:
+            self._mask[newly_expired] = False
+            self.consented_count -= changed
+            self._filtered = None
+
+        self._cursor = cursor
+        self._now = now_ns
+        return changed
+
+    def update_consent(self, patient_id: str, allow_training: bool, expiry_date: Optional[str] = None) -> bool:
+        """Apply a consent change for one patient, touching only that row"""
+        with self._lock:
+            return self._update_consent(patient_id, allow_training, expiry_date)
+
+    def _update_consent(self, patient_id: str, allow_training: bool, expiry_date: Optional[str]) -> bool:
+        pos = self._positions.get(patient_id)
+        if pos is None:
+            return False
+
+        if self.has_consent_column:
+            self.data.iat[pos, self.data.columns.get_loc('allow_training')] = allow_training
+        self._allow[pos] = bool(allow_training)
+
+        if expiry_date and 'expiry_date' in self.data.columns:
+            self.data.iat[pos, self.data.columns.get_loc('expiry_date')] = expiry_date
+            self._expiry[pos] = self._parse_expiry(pd.Series([expiry_date]))[0]
+            self._overrides[pos] = int(self._expiry[pos])
+
+        valid = bool(self._allow[pos] and self._expiry[pos] > self._now)
+        if valid != self._mask[pos]:
+            self._mask[pos] = valid
+            self.consented_count += 1 if valid else -1
+            self._filtered = None
+
+        # Fold overrides back into the sorted index once they stop being cheap to scan
+        if len(self._overrides) > max(64, len(self._expiry) // 16):
+            self._build_index(self._now)
+        return True
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Current consent mask (read-only copy)"""
+        with self._lock:
+            self.refresh()
+            mask = self._mask.copy()
+        mask.flags.writeable = False
+        return mask
+
+    def filtered(self) -> pd.DataFrame:
+        """Consented rows; the frame is cached and shared, so do not mutate it"""
+        if not self.has_consent_column:
+            return self.data
+
+        with self._lock:
+            self.refresh()
+            filtered = self._filtered
+            if filtered is None:
+                filtered = self._filtered = self.data[self._mask]
+        return filtered
+
+
+class PreprocessingCache:
+    """LRU cache of preprocessed training arrays keyed on the consent-set fingerprint"""
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(data: pd.DataFrame, feature_columns: List[str], target_column: str) -> str:
+        """Hash of the consented row IDs plus the feature list and target"""
+        row_ids = data['patient_id'] if 'patient_id' in data.columns else data.index.to_series()
+        digest = hashlib.sha256(pd.util.hash_pandas_object(row_ids, index=False).to_numpy().tobytes())
+        digest.update(json.dumps([feature_columns, target_column]).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def copy(self) -> 'PreprocessingCache':
+        """Independent cache sharing the (read-only) cached arrays"""
+        clone = PreprocessingCache(self.max_entries)
+        clone._entries = OrderedDict(self._entries)
+        clone.hits = self.hits
+        clone.misses = self.misses
+        return clone
+
+
+class ParameterAggregator:
+    """Vectorized FedAvg over flattened MLP parameters.
+
+    Each client's coefs_/intercepts_ are packed into one row of a reusable
+    (clients x parameters) matrix, combined with a single weighted matmul
+    into a preallocated global vector, and handed back as per-layer views.
+    Views returned by aggregate() are overwritten by the next call.
+    """
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self._layout: Optional[List[Tuple[int, tuple]]] = None
+        self._client_matrix: Optional[np.ndarray] = None
+        self._global: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _layers(params: dict) -> list:
+        return list(params['coefs_']) + list(params['intercepts_'])
+
+    def _prepare(self, first_params: dict, n_clients: int):
+        """(Re)allocate buffers when the architecture or client count changes"""
+        shapes = [np.shape(layer) for layer in self._layers(first_params)]
+        if self._layout is None or [shape for _, shape in self._layout] != shapes:
+            offsets = np.concatenate([[0], np.cumsum([int(np.prod(shape)) for shape in shapes])])
+            self._layout = list(zip(offsets[:-1].tolist(), shapes))
+            self._global = np.empty(int(offsets[-1]), dtype=self.dtype)
+            self._client_matrix = None
+
+        if self._client_matrix is None or self._client_matrix.shape[0] < n_clients:
+            self._client_matrix = np.empty((n_clients, self._global.size), dtype=self.dtype)
+
+    def flatten(self, params: dict, out: np.ndarray):
+        """Pack one client's layers into a contiguous parameter vector"""
+        layers = self._layers(params)
+        if [np.shape(layer) for layer in layers] != [shape for _, shape in self._layout]:
+            raise ValueError("All clients must share the same MLP architecture")
+        np.concatenate([np.ravel(layer) for layer in layers], out=out, casting='same_kind')
+
+    def unflatten(self, vector: np.ndarray) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Split a parameter vector back into per-layer views (no copies)"""
+        layers = [vector[offset:offset + int(np.prod(shape))].reshape(shape) for offset, shape in self._layout]
+        n_coefs = len(layers) // 2
+        return layers[:n_coefs], layers[n_coefs:]
+
+    def aggregate(self, local_parameters: List[dict], weights: List[float]) -> dict:
+        """Weighted average of client parameters"""
+        n_clients = len(local_parameters)
+        self._prepare(local_parameters[0], n_clients)
+
+        clients = self._client_matrix[:n_clients]
+        for row, params in zip(clients, local_parameters):
+            self.flatten(params, row)
+
+        normalized = np.asarray(weights, dtype=self.dtype)
+        normalized /= normalized.sum()
+        np.dot(normalized, clients, out=self._global)
+
+        coefs, intercepts = self.unflatten(self._global)
+        return {
+            'coefs_': coefs,
+            'intercepts_': intercepts,
+            'classes_': local_parameters[0]['classes_']
+        }
+
+
+class ModelHandle:
+    """Reference to one version of the global model held in a GlobalModelStore"""
+
+    def __init__(self, store: 'GlobalModelStore', version: int):
+        self.store = store
+        self.version = version
+
+    @property
+    def parameters(self) -> dict:
+        """Shared, read-only parameters of this version"""
+        if self.store is None:
+            raise ValueError(f"Handle for global model v{self.version} is detached from its store")
+        return self.store.get(self.version)
+
+    def writable_copy(self) -> dict:
+        """Private copy for callers that need to modify the parameters (copy-on-write)"""
+        return GlobalModelStore.copy_parameters(self.parameters, writable=True)
+
+    def release(self):
+        if self.store is not None:
+            self.store.release(self.version)
+            self.store = None
+
+    def __getstate__(self):
+        # Only the version crosses process boundaries; the store stays with the server
+        return {'store': None, 'version': self.version}
+
+
+class GlobalModelStore:
+    """Versioned, reference-counted store for aggregated global model parameters.
+
+    Each published version is frozen (arrays read-only, estimator lists as
+    tuples) so every holder shares the same objects; writers take a copy via
+    ModelHandle.writable_copy(). The latest version is always kept and older
+    versions are evicted as soon as no handle references them.
+    """
+
+    def __init__(self):
+        self._versions: Dict[int, dict] = {}
+        self._refcounts: Dict[int, int] = {}
+        self.latest_version = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def copy_parameters(parameters: dict, writable: bool = False) -> dict:
+        """Copy arrays and estimator lists so the store does not alias caller buffers"""
+        copied = {}
+        for key, value in parameters.items():
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+                value.flags.writeable = writable
+            elif isinstance(value, (list, tuple)):
+                items = [item.copy() if isinstance(item, np.ndarray) else item for item in value]
+                for item in items:
+                    if isinstance(item, np.ndarray):
+                        item.flags.writeable = writable
+                value = items if writable else tuple(items)
+            copied[key] = value
+        return copied
+
+    def publish(self, parameters: dict) -> int:
+        """Store a new global version and return its number"""
+        frozen = self.copy_parameters(parameters)
+        with self._lock:
+            self.latest_version += 1
+            self._versions[self.latest_version] = frozen
+            self._refcounts[self.latest_version] = 0
+            self._evict_unreferenced()
+            return self.latest_version
+
+    def acquire(self, version: Optional[int] = None) -> ModelHandle:
+        """Take a reference to a version (the latest by default)"""
+        with self._lock:
+            version = self.latest_version if version is None else version
+            if version not in self._versions:
+                raise KeyError(f"Global model version {version} is not resident")
+            self._refcounts[version] += 1
+            return ModelHandle(self, version)
+
+    def release(self, version: int):
+        with self._lock:
+            if version in self._refcounts:
+                self._refcounts[version] -= 1
+                self._evict_unreferenced()
+
+    def get(self, version: int) -> dict:
+        with self._lock:
+            return self._versions[version]
+
+    def _evict_unreferenced(self):
+        for version in [v for v, count in self._refcounts.items() if count <= 0 and v != self.latest_version]:
+            del self._versions[version]
+            del self._refcounts[version]
+
+    def resident_versions(self) -> Dict[int, int]:
+        """Resident versions mapped to their reference counts"""
+        with self._lock:
+            return dict(self._refcounts)
+
+
+def warm_update(model, X: np.ndarray, y: np.ndarray, epochs: int = 1, trees_per_round: int = 10) -> bool:
+    """Continue training a fitted MLP or random forest instead of refitting it
+
+    MLPs run `epochs` passes of partial_fit from their current weights.
+    Random forests replace their oldest trees_per_round trees with new trees
+    grown on X, y, so the forest keeps its size. Returns False, leaving the
+    model untouched, when it cannot be continued (not fitted yet, or y holds
+    classes the model has not seen) and the caller should fit it instead.
+    """
+    labels = np.unique(y)
+
+    if isinstance(model, MLPClassifier):
+        if not hasattr(model, 'coefs_') or not np.isin(labels, model.classes_).all():
+            return False
+        if model.early_stopping:
+            # partial_fit cannot hold out an early-stopping split; track the training loss instead
+            model.early_stopping = False
+            model.best_loss_ = np.inf
+        for _ in range(epochs):
+            model.partial_fit(X, y)
+        return True
+
+    if isinstance(model, RandomForestClassifier):
+        if not hasattr(model, 'estimators_') or not np.array_equal(labels, model.classes_):
+            return False
+        n_trees = len(model.estimators_)
+        retired = min(trees_per_round, n_trees)
+        model.estimators_ = model.estimators_[retired:]
+        model.n_estimators = n_trees - retired + trees_per_round
+        model.warm_start = True
+        try:
+            model.fit(X, y)
+        finally:
+            model.warm_start = False
+        return True
+
+    return False
+
+
+def feature_statistics(features: pd.DataFrame) -> dict:
+    """Per-feature count, sum and sum of squares of the non-missing values
+
+    These totals are all a node shares for federated scaling; its rows stay local.
+    """
+    values = features.to_numpy(dtype=np.float64)
+    present = ~np.isnan(values)
+    values = np.where(present, values, 0.0)
+    return {
+        'features': list(features.columns),
+        'count': present.sum(axis=0),
+        'sum': values.sum(axis=0),
+        'sumsq': np.square(values).sum(axis=0)
+    }
+
+
+def scaler_from_statistics(statistics: List[dict]) -> StandardScaler:
+    """Fitted StandardScaler with the pooled mean and variance of several nodes' statistics
+
+    Equivalent to fitting one scaler on the union of the nodes' rows.
+    """
+    features = list(dict.fromkeys(name for stats in statistics for name in stats['features']))
+    position = {name: idx for idx, name in enumerate(features)}
+    count = np.zeros(len(features))
+    total = np.zeros(len(features))
+    total_sq = np.zeros(len(features))
+    for stats in statistics:
+        idx = [position[name] for name in stats['features']]
+        count[idx] += stats['count']
+        total[idx] += stats['sum']
+        total_sq[idx] += stats['sumsq']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, 0.0)
+        var = np.where(count > 0, np.maximum(total_sq / count - mean ** 2, 0.0), 0.0)
+    scale = np.sqrt(var)
+    # Constant features are left unscaled, as StandardScaler does
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+
+    scaler = StandardScaler()
+    scaler.n_features_in_ = len(features)
+    scaler.feature_names_in_ = np.array(features, dtype=object)
+    scaler.n_samples_seen_ = count.astype(np.int64)
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = scale
+    return scaler
+
 
 class FederatedModel:
     """Base class for federated learning models"""
 
+    FEATURE_COLUMNS = [
+        'age', 'systolic_bp', 'diastolic_bp', 'heart_rate',
+        'temperature', 'glucose_level', 'cholesterol', 'bmi'
+    ]
+
     def __init__(self, model_type: str = 'random_forest'):
         self.model_type = model_type
         self.model = None
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         self.is_fitted = False
+        # True once a pre-fitted (federated) scaler replaces per-call refitting
+        self.fixed_scaler = False
 
         # Initialize model based on type
         self._initialize_model()
@@ -39,33 +497,105 @@ class FederatedModel:
         else:
             raise ValueError(f"Unsupported model type: {self.model_type}")
 
-    def preprocess_data(self, data: pd.DataFrame, target_column: str = 'primary_condition') -> Tuple[np.ndarray, np.ndarray]:
-        """Preprocess data for training"""
-        # Select relevant features
-        feature_columns = [
-            'age', 'systolic_bp', 'diastolic_bp', 'heart_rate', 
-            'temperature', 'glucose_level', 'cholesterol', 'bmi'
-        ]
+    def preprocess_data(self, data: pd.DataFrame, target_column: str = 'primary_condition',
+                        cache: Optional[PreprocessingCache] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Preprocess data for training
 
+        With a cache, an unchanged consent set reuses the previously scaled
+        arrays and fitted scaler/encoder. Cached arrays are read-only. With a
+        fixed scaler (see use_scaler) features are only transformed.
+        """
         # Handle missing features
-        available_features = [col for col in feature_columns if col in data.columns]
+        available_features = [col for col in self.FEATURE_COLUMNS if col in data.columns]
+
+        if cache is not None:
+            key = PreprocessingCache.fingerprint(data, available_features, target_column)
+            if self.fixed_scaler:
+                # Cached arrays are only valid for the scaler they were transformed with
+                key += hashlib.sha256(self.scaler.mean_.tobytes() + self.scaler.scale_.tobytes()).hexdigest()
+            entry = cache.get(key)
+            if entry is not None:
+                X_scaled, y_encoded, self.scaler, self.label_encoder = entry
+                return X_scaled, y_encoded
 
-        X = data[available_features].fillna(data[available_features].mean())
         y = data[target_column].fillna('Unknown')
 
         # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        if self.fixed_scaler:
+            X_scaled = self.transform_features(data)
+        else:
+            X = data[available_features].fillna(data[available_features].mean())
+            X_scaled = self.scaler.fit_transform(X)
 
         # Encode labels
         y_encoded = self.label_encoder.fit_transform(y)
 
+        if cache is not None:
+            X_scaled.flags.writeable = False
+            y_encoded.flags.writeable = False
+            cache.put(key, (X_scaled, y_encoded, self.scaler, self.label_encoder))
+
         return X_scaled, y_encoded
 
+    def use_scaler(self, scaler: StandardScaler):
+        """Scale with a pre-fitted scaler, such as the federated one, instead of refitting per call"""
+        self.scaler = scaler
+        self.fixed_scaler = True
+
+    def transform_features(self, data: pd.DataFrame) -> np.ndarray:
+        """Scale features with the already-fitted scaler, for evaluation data
+
+        Missing values take the scaler's (training) means, so no statistic is
+        computed from the rows being transformed.
+        """
+        available_features = [col for col in self.FEATURE_COLUMNS if col in data.columns]
+        X = data[available_features].fillna(pd.Series(self.scaler.mean_, index=available_features))
+        return self.scaler.transform(X)
+
     def fit(self, X: np.ndarray, y: np.ndarray):
         """Train the model"""
         self.model.fit(X, y)
         self.is_fitted = True
 
+    def warm_fit(self, X: np.ndarray, y: np.ndarray, epochs: int = 1, trees_per_round: int = 10,
+                 initial_parameters: Optional[dict] = None):
+        """Continue training from the current state instead of refitting (see warm_update)
+
+        For MLPs, initial_parameters (the latest global weights) are loaded
+        first when the architecture matches; they are trained in place, so
+        pass a writable copy. An MLP without a previous model starts from
+        partial_fit rather than a full fit. Falls back to fit whenever the
+        model cannot be continued.
+        """
+        if self.model_type == 'mlp':
+            if not self.is_fitted:
+                # Nodes share one initialisation so the first average is meaningful
+                if self.model.random_state is None:
+                    self.model.random_state = 0
+                # One row is enough for partial_fit to build the layers
+                self.model.partial_fit(X[:1], y[:1], classes=np.arange(len(self.label_encoder.classes_)))
+                self.is_fitted = True
+            if initial_parameters is not None:
+                self._load_global_weights(initial_parameters)
+        elif not self.is_fitted:
+            self.fit(X, y)
+            return
+
+        if not warm_update(self.model, X, y, epochs, trees_per_round):
+            self.fit(X, y)
+
+    def _load_global_weights(self, parameters: dict) -> bool:
+        """Replace the MLP's weights with global ones of the same shapes"""
+        coefs, intercepts = parameters.get('coefs_'), parameters.get('intercepts_')
+        if coefs is None or intercepts is None:
+            return False
+        if ([np.shape(layer) for layer in coefs] != [layer.shape for layer in self.model.coefs_]
+                or [np.shape(layer) for layer in intercepts] != [layer.shape for layer in self.model.intercepts_]):
+            return False
+        self.model.coefs_ = list(coefs)
+        self.model.intercepts_ = list(intercepts)
+        return True
+
     def predict(self, X: np.ndarray) -> np.ndarray:
         """Make predictions"""
         if not self.is_fitted:
@@ -83,6 +613,41 @@ class FederatedModel:
             # For SVM without probability=True
             return np.eye(len(self.label_encoder.classes_))[self.predict(X)]
 
+    def rank_estimators(self, X_val: np.ndarray, y_val: np.ndarray,
+                        order: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Score each tree on validation data and order trees for ensemble pruning
+
+        Returns per-tree validation accuracy and a greedy reduce-error order:
+        starting from the best tree, each step adds the tree that most improves
+        the majority vote, which favours trees that correct each other's mistakes.
+        The order is quadratic in the number of trees; with order=False it is
+        skipped and None is returned in its place.
+        """
+        classes = self.model.classes_
+        # Trees predict indices into the forest's classes_
+        tree_preds = np.stack([classes[tree.predict(X_val).astype(int)] for tree in self.model.estimators_])
+        scores = (tree_preds == y_val).mean(axis=1)
+        if not order:
+            return scores, None
+
+        class_index = {label: idx for idx, label in enumerate(classes)}
+        pred_idx = np.vectorize(class_index.get)(tree_preds)
+        y_idx = np.array([class_index.get(label, -1) for label in y_val])
+        one_hot = np.eye(len(classes), dtype=np.int32)[pred_idx]  # trees x samples x classes
+
+        votes = np.zeros(one_hot.shape[1:], dtype=np.int32)
+        remaining = np.ones(len(scores), dtype=bool)
+        ranking = []
+        for _ in range(len(scores)):
+            candidate_acc = ((votes[None] + one_hot).argmax(axis=2) == y_idx).mean(axis=1)
+            candidate_acc[~remaining] = -1.0
+            best = int(np.argmax(candidate_acc))
+            ranking.append(best)
+            remaining[best] = False
+            votes += one_hot[best]
+
+        return scores, np.array(ranking)
+
     def get_parameters(self) -> dict:
         """Get model parameters for federated averaging"""
         if not self.is_fitted:
@@ -115,23 +680,29 @@ class FederatedModel:
              # In a real FL Random Forest, we aggregate trees from all nodes
              # parameters['estimators_'] is a list of trees from all nodes
              if 'estimators_' in parameters:
-                 self.model.estimators_ = parameters['estimators_']
+                 self.model.estimators_ = list(parameters['estimators_'])
                  self.model.n_estimators = len(self.model.estimators_)
+                 if self.model.estimators_:
+                     self.model.n_outputs_ = self.model.estimators_[0].n_outputs_
+                     self.model.n_features_in_ = self.model.estimators_[0].n_features_in_
              if 'classes_' in parameters:
                  self.model.classes_ = parameters['classes_']
                  self.model.n_classes_ = len(self.model.classes_)
 
         elif self.model_type == 'mlp':
-            # Set coefficients and intercepts
-            if 'coefs_' in parameters and 'intercepts_' in parameters:
-                self.model.coefs_ = parameters['coefs_']
-                self.model.intercepts_ = parameters['intercepts_']
-                
-            if 'classes_' in parameters:
-                self.model.classes_ = parameters['classes_']
-                # Force re-initialization of properties if needed
-                self.model.n_outputs_ = len(self.model.classes_)
-                self.model.out_activation_ = 'logistic' if self.model.n_outputs_ == 1 else 'softmax'
+            classes = parameters.get('classes_', getattr(self.model, 'classes_', None))
+            if 'coefs_' in parameters and 'intercepts_' in parameters and classes is not None:
+                coefs = list(parameters['coefs_'])
+                # Build the network through partial_fit on a single row so sklearn sets up
+                # everything predict needs, then swap in the aggregated weights
+                model = MLPClassifier(**self.model.get_params())
+                model.set_params(hidden_layer_sizes=tuple(layer.shape[1] for layer in coefs[:-1]),
+                                 early_stopping=False)
+                model.partial_fit(np.zeros((1, coefs[0].shape[0])), np.asarray(classes)[:1], classes=classes)
+                model.set_params(early_stopping=self.model.early_stopping)
+                model.coefs_ = coefs
+                model.intercepts_ = list(parameters['intercepts_'])
+                self.model = model
         
         # SVM parameter setting is more complex and model-dependent
         
@@ -144,7 +715,8 @@ class FederatedModel:
             'model': self.model,
             'scaler': self.scaler,
             'label_encoder': self.label_encoder,
-            'is_fitted': self.is_fitted
+            'is_fitted': self.is_fitted,
+            'fixed_scaler': self.fixed_scaler
         }
         joblib.dump(model_data, filepath)
 
@@ -157,13 +729,14 @@ class FederatedModel:
         instance.scaler = model_data['scaler']
         instance.label_encoder = model_data['label_encoder']
         instance.is_fitted = model_data['is_fitted']
+        instance.fixed_scaler = model_data.get('fixed_scaler', False)
         return instance
 
 
 class FederatedLearningNode:
     """Individual node in the federated learning network"""
 
-    def __init__(self, node_id: str, hospital_name: str, data_path: str):
+    def __init__(self, node_id: str, hospital_name: str, data_path: str, holdout_fraction: float = 0.1):
         self.node_id = node_id
         self.hospital_name = hospital_name
         self.data_path = data_path
@@ -171,25 +744,46 @@ class FederatedLearningNode:
         self.model = None
         self.training_history = []
         self.last_update = None
+        self.preprocessing_cache = PreprocessingCache()
+        self.global_handle: Optional[ModelHandle] = None
 
-        # Load data
-        self.load_data()
+        # Share of patients reserved for evaluating the global model
+        self.holdout_fraction = holdout_fraction
+        self._holdout_cache: Optional[tuple] = None
+
+        # Scaler fitted from every node's pooled statistics, broadcast by the server
+        self.global_scaler: Optional[StandardScaler] = None
 
         # Setup logging
         self.logger = logging.getLogger(f"FL_Node_{node_id}")
         self.logger.setLevel(logging.INFO)
 
+        # Load data
+        self.load_data()
+
     def load_data(self):
         """Load and preprocess node data"""
         try:
-            self.data = pd.read_csv(self.data_path)
+            # Memory-mapped columnar copy of the CSV, limited to the training columns
+            self.data = load_node_frame(self.data_path)
             self.logger.info(f"Loaded {len(self.data)} records for {self.hospital_name}")
         except Exception as e:
             self.logger.error(f"Error loading data: {e}")
             self.data = pd.DataFrame()  # Empty dataframe
 
+        self.consent_view = ConsentView(self.data)
+
+    def update_consent(self, patient_id: str, allow_training: bool, expiry_date: Optional[str] = None) -> bool:
+        """Apply a single patient's consent change to the node's data"""
+        return self.consent_view.update_consent(patient_id, allow_training, expiry_date)
+
     def apply_consent_filter(self, data: pd.DataFrame) -> pd.DataFrame:
         """Apply consent filtering as per Equation 3.1: D_filtered = {xi ∈ D : xi.allow_training = true}"""
+        if data is self.data and self.consent_view.has_consent_column:
+            consented_data = self.consent_view.filtered()
+            self.logger.info(f"Consent filtering: {len(data)} -> {len(consented_data)} records")
+            return consented_data
+
         if 'allow_training' not in data.columns:
             self.logger.warning("No consent column found, using all data")
             return data
@@ -206,8 +800,71 @@ class FederatedLearningNode:
         self.logger.info(f"Consent filtering: {len(data)} -> {len(consented_data)} records")
         return consented_data
 
-    def local_train(self, model_type: str = 'random_forest', epochs: int = 1) -> dict:
-        """Perform local training on consented data"""
+    def holdout_flags(self, data: pd.DataFrame) -> np.ndarray:
+        """Rows of data reserved for evaluation
+
+        Assignment hashes the patient ID, so a patient stays on the same side
+        as consent changes and across processes.
+        """
+        if self.holdout_fraction <= 0 or 'patient_id' not in data.columns:
+            return np.zeros(len(data), dtype=bool)
+        buckets = pd.util.hash_pandas_object(data['patient_id'], index=False).to_numpy() % 10_000
+        return buckets < self.holdout_fraction * 10_000
+
+    def training_rows(self) -> pd.DataFrame:
+        """Consented rows available for local training; holdout rows are kept for evaluation"""
+        consented = self.apply_consent_filter(self.data)
+        return consented[~self.holdout_flags(consented)]
+
+    def feature_statistics(self) -> Optional[dict]:
+        """Per-feature count, sum and sum of squares over the training rows, for the federated scaler"""
+        if self.data is None or len(self.data) == 0:
+            return None
+        training_data = self.training_rows()
+        if len(training_data) == 0:
+            return None
+        available_features = [col for col in FederatedModel.FEATURE_COLUMNS if col in training_data.columns]
+        return feature_statistics(training_data[available_features])
+
+    def evaluation_holdout(self, target_column: str = 'primary_condition') -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Consented holdout rows as (scaled features, label names), or None
+
+        Features go through the node's already-fitted scaler. The arrays are
+        cached (read-only) until the consented holdout or the scaler changes.
+        """
+        if self.model is None or not self.model.is_fitted or self.data is None or len(self.data) == 0:
+            return None
+
+        consented = self.apply_consent_filter(self.data)
+        holdout = consented[self.holdout_flags(consented)]
+        if len(holdout) == 0:
+            return None
+
+        scaler = self.model.scaler
+        key = (PreprocessingCache.fingerprint(holdout, FederatedModel.FEATURE_COLUMNS, target_column),
+               scaler.mean_.tobytes(), scaler.scale_.tobytes())
+        if self._holdout_cache is not None and self._holdout_cache[0] == key:
+            return self._holdout_cache[1]
+
+        X = self.model.transform_features(holdout)
+        labels = holdout[target_column].fillna('Unknown').to_numpy()
+        X.flags.writeable = False
+        labels.flags.writeable = False
+        self._holdout_cache = (key, (X, labels))
+        return X, labels
+
+    def local_train(self, model_type: str = 'random_forest', epochs: int = 1, warm_start: bool = False,
+                    trees_per_round: int = 10, initial_parameters: Optional[dict] = None,
+                    tree_scoring: Optional[str] = None) -> dict:
+        """Perform local training on consented data
+
+        With warm_start the node continues its previous model, and an MLP
+        starts from the latest global weights, instead of refitting from
+        scratch; epochs is then the number of local passes. Workers whose
+        global handle is detached receive those weights as initial_parameters.
+        tree_scoring ('scores' or 'rank', see ForestSelector.tree_scoring)
+        adds per-tree validation results to random forest parameters.
+        """
         if self.data is None or len(self.data) == 0:
             return {
                 'success': False,
@@ -215,8 +872,8 @@ class FederatedLearningNode:
                 'metrics': {}
             }
 
-        # Apply consent filter
-        training_data = self.apply_consent_filter(self.data)
+        # Apply consent filter; holdout rows are kept for evaluating the global model
+        training_data = self.training_rows()
 
         if len(training_data) == 0:
             return {
@@ -229,17 +886,26 @@ class FederatedLearningNode:
             # Initialize model if not exists
             if self.model is None or self.model.model_type != model_type:
                 self.model = FederatedModel(model_type)
+            if self.global_scaler is not None:
+                self.model.use_scaler(self.global_scaler)
 
             # Preprocess data
-            X, y = self.model.preprocess_data(training_data)
+            X, y = self.model.preprocess_data(training_data, cache=self.preprocessing_cache)
 
-            # Split for validation - randomness enabled
+            # Split for validation - randomness enabled, except that a warm-started
+            # model keeps one split so it never trains on earlier validation rows
             X_train, X_val, y_train, y_val = train_test_split(
-                X, y, test_size=0.2, stratify=y
+                X, y, test_size=0.2, stratify=y, random_state=0 if warm_start else None
             )
 
             # Train model
-            self.model.fit(X_train, y_train)
+            fit_start = time.perf_counter()
+            if warm_start:
+                global_parameters = self._warm_start_parameters(initial_parameters) if model_type == 'mlp' else None
+                self.model.warm_fit(X_train, y_train, epochs, trees_per_round, global_parameters)
+            else:
+                self.model.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - fit_start
 
             # Evaluate
             train_predictions = self.model.predict(X_train)
@@ -252,13 +918,22 @@ class FederatedLearningNode:
             train_loss = 1.0 - train_accuracy
             val_loss = 1.0 - val_accuracy
 
+            parameters = self.model.get_parameters() if self.model.is_fitted else {}
+            if model_type == 'random_forest' and parameters and tree_scoring:
+                # Per-tree validation scores let the server bound the global forest
+                scores, ranking = self.model.rank_estimators(X_val, y_val, order=tree_scoring == 'rank')
+                parameters['tree_scores'] = scores
+                if ranking is not None:
+                    parameters['tree_rank'] = ranking
+
             metrics = {
                 'train_accuracy': train_accuracy,
                 'val_accuracy': val_accuracy,
                 'train_loss': train_loss,
                 'val_loss': val_loss,
                 'data_points': len(training_data),
-                'consented_data_points': len(training_data)
+                'consented_data_points': len(training_data),
+                'fit_seconds': fit_seconds
             }
 
             # Store training history
@@ -266,7 +941,8 @@ class FederatedLearningNode:
                 'timestamp': datetime.now().isoformat(),
                 'metrics': metrics,
                 'model_type': model_type,
-                'epochs': epochs
+                'epochs': epochs,
+                'warm_start': warm_start
             })
 
             self.last_update = datetime.now()
@@ -275,7 +951,7 @@ class FederatedLearningNode:
                 'success': True,
                 'message': 'Local training completed',
                 'metrics': metrics,
-                'parameters': self.model.get_parameters() if self.model.is_fitted else {}
+                'parameters': parameters
             }
 
         except Exception as e:
@@ -286,14 +962,44 @@ class FederatedLearningNode:
                 'metrics': {}
             }
 
-    def update_model(self, global_parameters: dict):
-        """Update local model with global parameters"""
+    def detached_copy(self) -> 'FederatedLearningNode':
+        """Copy with private training state for a thread worker
+
+        local_train on the copy leaves this node untouched; the server
+        installs the copy's model, history and cache only if it finishes in
+        time. The copy has no global handle, so the server passes global
+        weights explicitly.
+        """
+        clone = copy.copy(self)
+        clone.model = copy.deepcopy(self.model)
+        clone.training_history = list(self.training_history)
+        clone.preprocessing_cache = self.preprocessing_cache.copy()
+        clone.global_handle = None
+        return clone
+
+    def _warm_start_parameters(self, initial_parameters: Optional[dict]) -> Optional[dict]:
+        """Writable copy of the global parameters to continue from, if any"""
+        if initial_parameters is not None:
+            return GlobalModelStore.copy_parameters(initial_parameters, writable=True)
+        if self.global_handle is not None and self.global_handle.store is not None:
+            return self.global_handle.writable_copy()
+        return None
+
+    def update_model(self, handle: ModelHandle):
+        """Point the node at a new global model version
+
+        The node keeps a handle into the server's model store rather than its
+        own copy of the aggregated parameters, releasing the previous version.
+        """
         try:
             if self.model is None:
                 self.logger.warning("No local model to update")
+                handle.release()
                 return False
 
-            self.model.set_parameters(global_parameters)
+            if self.global_handle is not None:
+                self.global_handle.release()
+            self.global_handle = handle
             self.last_update = datetime.now()
             return True
 
@@ -301,33 +1007,257 @@ class FederatedLearningNode:
             self.logger.error(f"Error updating model: {e}")
             return False
 
+    @property
+    def global_version(self) -> Optional[int]:
+        return self.global_handle.version if self.global_handle else None
+
     def get_node_info(self) -> dict:
         """Get comprehensive node information"""
-        consented_data = self.apply_consent_filter(self.data) if self.data is not None else pd.DataFrame()
+        self.consent_view.refresh()
+        consented_count = self.consent_view.consented_count
 
         return {
             'node_id': self.node_id,
             'hospital_name': self.hospital_name,
             'total_data_points': len(self.data) if self.data is not None else 0,
-            'consented_data_points': len(consented_data),
-            'consent_rate': len(consented_data) / len(self.data) if self.data is not None and len(self.data) > 0 else 0,
+            'consented_data_points': consented_count,
+            'consent_rate': consented_count / len(self.data) if self.data is not None and len(self.data) > 0 else 0,
             'last_update': self.last_update.isoformat() if self.last_update else None,
             'training_rounds': len(self.training_history),
             'model_type': self.model.model_type if self.model else None,
-            'is_fitted': self.model.is_fitted if self.model else False
+            'is_fitted': self.model.is_fitted if self.model else False,
+            'global_version': self.global_version
         }
 
 
+class ForestSelector:
+    """Bounds the aggregated Federated Forest to a fixed number of trees.
+
+    Strategies:
+      - 'accuracy': keep the trees with the best per-tree validation accuracy
+      - 'data_share': give each node a quota proportional to its data share and
+        keep its most accurate trees
+      - 'diversity': same quotas, filled in each node's reduce-error pruning order
+    """
+
+    STRATEGIES = ('accuracy', 'data_share', 'diversity')
+
+    def __init__(self, max_trees: Optional[int] = None, strategy: str = 'accuracy'):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported tree selection strategy: {strategy}")
+        self.max_trees = max_trees
+        self.strategy = strategy
+
+    @property
+    def tree_scoring(self) -> Optional[str]:
+        """What nodes must report per tree: None, 'scores' or 'rank' (scores and pruning order)"""
+        if self.max_trees is None:
+            return None
+        return 'rank' if self.strategy == 'diversity' else 'scores'
+
+    @staticmethod
+    def _quotas(sizes: List[int], weights: List[float], budget: int) -> List[int]:
+        """Largest-remainder allocation of the tree budget by data share"""
+        share = np.asarray(weights, dtype=float) / sum(weights) * budget
+        quotas = np.minimum(np.floor(share).astype(int), sizes)
+        remainder = share - quotas
+        while quotas.sum() < min(budget, sum(sizes)):
+            open_nodes = quotas < sizes
+            idx = int(np.argmax(np.where(open_nodes, remainder, -np.inf)))
+            quotas[idx] += 1
+            remainder[idx] = -np.inf if quotas[idx] >= sizes[idx] else remainder[idx] - 1
+        return quotas.tolist()
+
+    def select(self, local_parameters: List[dict], weights: List[float]) -> list:
+        """Return the estimators kept for the global forest"""
+        estimators = [list(params.get('estimators_', [])) for params in local_parameters]
+        total = sum(len(trees) for trees in estimators)
+        if self.max_trees is None or total <= self.max_trees:
+            return [tree for trees in estimators for tree in trees]
+
+        # Nodes that did not report scores rank their trees in original order
+        scores = [np.asarray(params.get('tree_scores', np.zeros(len(trees))))
+                  for params, trees in zip(local_parameters, estimators)]
+
+        if self.strategy == 'accuracy':
+            pool = [(-score, node_idx, tree_idx)
+                    for node_idx, node_scores in enumerate(scores)
+                    for tree_idx, score in enumerate(node_scores)]
+            pool.sort()
+            return [estimators[node_idx][tree_idx] for _, node_idx, tree_idx in pool[:self.max_trees]]
+
+        quotas = self._quotas([len(trees) for trees in estimators], weights, self.max_trees)
+        selected = []
+        for params, trees, node_scores, quota in zip(local_parameters, estimators, scores, quotas):
+            if self.strategy == 'diversity' and 'tree_rank' in params:
+                order = params['tree_rank']
+            else:
+                order = np.argsort(-node_scores, kind='stable')
+            selected.extend(trees[i] for i in order[:quota])
+        return selected
+
+
+class FederatedEvaluator:
+    """Evaluates a global model on per-node holdouts with batched inference.
+
+    Holdouts arrive already preprocessed as (scaled features, label names);
+    the evaluator only runs predict_proba over batch_size-row slices, in
+    parallel across nodes on a thread pool, and reduces each node to a
+    confusion matrix and summed log loss. Pooled metrics are combined from
+    those, so no predictions are kept and nothing is fitted here.
+    """
+
+    def __init__(self, batch_size: int = 4096, max_workers: Optional[int] = None):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _metrics(confusion: np.ndarray, log_loss_sum: float) -> dict:
+        samples = int(confusion.sum())
+        true_positives = np.diag(confusion).astype(float)
+        support = confusion.sum(axis=1)
+        predicted = confusion.sum(axis=0)
+        # Macro F1 over classes that occur in the labels or the predictions
+        present = (support + predicted) > 0
+        f1 = 2 * true_positives[present] / (support[present] + predicted[present])
+        return {
+            'accuracy': float(true_positives.sum() / samples) if samples else 0.0,
+            'log_loss': float(log_loss_sum / samples) if samples else 0.0,
+            'macro_f1': float(f1.mean()) if f1.size else 0.0,
+            'samples': samples
+        }
+
+    def _evaluate_holdout(self, model: 'FederatedModel', X: np.ndarray, labels: np.ndarray,
+                          columns: Dict[str, int]) -> dict:
+        start = time.perf_counter()
+
+        # Label names -> predict_proba column; labels the model cannot predict are left out
+        target = pd.Series(labels).map(columns).to_numpy(dtype=float)
+        known = ~np.isnan(target)
+        X, target = X[known], target[known].astype(np.intp)
+
+        n_classes = len(columns)
+        confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+        log_loss_sum = 0.0
+        for offset in range(0, len(X), self.batch_size):
+            proba = model.predict_proba(X[offset:offset + self.batch_size])
+            batch_target = target[offset:offset + self.batch_size]
+            cells = batch_target * n_classes + proba.argmax(axis=1)
+            confusion += np.bincount(cells, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+            log_loss_sum -= np.log(np.clip(proba[np.arange(len(batch_target)), batch_target], 1e-15, 1.0)).sum()
+
+        seconds = time.perf_counter() - start
+        metrics = self._metrics(confusion, log_loss_sum)
+        metrics.update({
+            'unknown_labels': int((~known).sum()),
+            'seconds': seconds,
+            'rows_per_second': len(X) / seconds if seconds > 0 else 0.0
+        })
+        return {'metrics': metrics, 'confusion': confusion, 'log_loss_sum': log_loss_sum}
+
+    def evaluate(self, model: 'FederatedModel', holdouts: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> dict:
+        """Per-node and pooled metrics of a fitted global model on the given holdouts"""
+        # predict_proba column j is the model's class code classes_[j]
+        class_names = model.label_encoder.classes_
+        columns = {class_names[code]: j for j, code in enumerate(model.model.classes_)}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(holdouts) or 1,
+                                thread_name_prefix="FL_Eval") as executor:
+            futures = {node_id: executor.submit(self._evaluate_holdout, model, X, labels, columns)
+                       for node_id, (X, labels) in holdouts.items()}
+            results = {node_id: future.result() for node_id, future in futures.items()}
+        seconds = time.perf_counter() - start
+
+        confusion = sum(result['confusion'] for result in results.values())
+        pooled = self._metrics(confusion, sum(result['log_loss_sum'] for result in results.values()))
+        pooled['confusion_matrix'] = confusion.tolist()
+        return {
+            'per_node': {node_id: result['metrics'] for node_id, result in results.items()},
+            'pooled': pooled,
+            'classes': [str(class_names[code]) for code in model.model.classes_],
+            'seconds': seconds,
+            'rows_per_second': pooled['samples'] / seconds if seconds > 0 else 0.0
+        }
+
+
+def _local_train_worker(node: FederatedLearningNode, model_type: str,
+                        options: Optional[dict] = None) -> Tuple[dict, dict]:
+    """Run local training for one node inside an executor worker.
+
+    options are passed on to local_train. Returns the training result
+    together with the node state that local_train mutates, so the server can
+    install it on the registered node (workers train on a copy).
+    """
+    result = node.local_train(model_type, **(options or {}))
+    state = {
+        'model': node.model,
+        'training_history': node.training_history,
+        'last_update': node.last_update,
+        'preprocessing_cache': node.preprocessing_cache
+    }
+    return result, state
+
+
 class FederatedLearningServer:
     """Central server for federated learning coordination"""
 
-    def __init__(self):
+    EXECUTOR_MODES = ('sequential', 'thread', 'process')
+    LOCAL_UPDATE_MODES = ('refit', 'warm_start')
+
+    def __init__(self, executor: str = 'thread', max_workers: Optional[int] = None,
+                 node_timeout: Optional[float] = None, aggregation_dtype=np.float64,
+                 max_global_trees: Optional[int] = None, tree_selection: str = 'accuracy',
+                 staleness_exponent: float = 0.5, local_update: str = 'refit',
+                 local_epochs: int = 1, trees_per_round: int = 10, holdout_fraction: float = 0.1,
+                 evaluation_batch_size: int = 4096, federated_scaling: bool = True):
+        if executor not in self.EXECUTOR_MODES:
+            raise ValueError(f"Unsupported executor mode: {executor}")
+        if local_update not in self.LOCAL_UPDATE_MODES:
+            raise ValueError(f"Unsupported local update mode: {local_update}")
+
         self.nodes: Dict[str, FederatedLearningNode] = {}
         self.global_model = None
         self.training_rounds = []
         self.current_round = 0
         self.is_training = False
 
+        # Parallel local training configuration
+        self.executor = executor
+        self.max_workers = max_workers
+        self.node_timeout = node_timeout
+
+        # Reusable buffers for MLP parameter averaging
+        self.aggregator = ParameterAggregator(dtype=aggregation_dtype)
+
+        # Asynchronous training: updates are weighted by (1 + staleness) ** -staleness_exponent
+        self.staleness_exponent = staleness_exponent
+        self.async_report = None
+
+        # Versioned global parameters shared by the global model and all nodes
+        self.model_store = GlobalModelStore()
+
+        # Size bound for the aggregated Federated Forest (None keeps every tree)
+        self.forest_selector = ForestSelector(max_global_trees, tree_selection)
+
+        # Local update per round: 'refit' trains from scratch, 'warm_start' runs
+        # local_epochs MLP passes from the global weights or grows trees_per_round new trees
+        self.local_update = local_update
+        self.local_epochs = local_epochs
+        self.trees_per_round = trees_per_round
+
+        # Global model evaluation on cached per-node holdouts
+        self.holdout_fraction = holdout_fraction
+        self.evaluator = FederatedEvaluator(evaluation_batch_size, max_workers)
+        self._external_holdouts: Dict[str, tuple] = {}
+
+        # One scaler from pooled node statistics, computed before the first round and reused
+        self.federated_scaling = federated_scaling
+        self.global_scaler: Optional[StandardScaler] = None
+
+        # Thread workers that outlived node_timeout; their nodes sit out until they finish
+        self._stale_workers: Dict[str, object] = {}
+
         # Setup logging
         self.logger = logging.getLogger("FL_Server")
         self.logger.setLevel(logging.INFO)
@@ -335,7 +1265,8 @@ class FederatedLearningServer:
     def register_node(self, node_id: str, hospital_name: str, data_path: str) -> bool:
         """Register a new node"""
         try:
-            node = FederatedLearningNode(node_id, hospital_name, data_path)
+            node = FederatedLearningNode(node_id, hospital_name, data_path, self.holdout_fraction)
+            node.global_scaler = self.global_scaler
             self.nodes[node_id] = node
             self.logger.info(f"Registered node {node_id}: {hospital_name}")
             return True
@@ -348,24 +1279,42 @@ class FederatedLearningServer:
         self.global_model = FederatedModel(model_type)
         self.logger.info(f"Initialized global {model_type} model")
 
+    def compute_global_scaler(self) -> Optional[StandardScaler]:
+        """Run the federated statistics pass and broadcast the resulting scaler
+
+        Each node reports only per-feature count, sum and sum of squares of
+        its training rows; the server pools them into the global mean and
+        variance and hands every node the same fixed scaler. Training runs
+        this once before the first round; call it again to refresh the
+        scaler after large consent changes.
+        """
+        statistics = [stats for stats in (node.feature_statistics() for node in self.nodes.values())
+                      if stats is not None]
+        if not statistics:
+            return None
+
+        self.global_scaler = scaler_from_statistics(statistics)
+        for node in self.nodes.values():
+            node.global_scaler = self.global_scaler
+        self.logger.info(f"Federated scaler computed from {len(statistics)} nodes "
+                         f"({int(self.global_scaler.n_samples_seen_.max())} rows)")
+        return self.global_scaler
+
+    def _prepare_scaling(self):
+        if self.federated_scaling and self.global_scaler is None:
+            self.compute_global_scaler()
+
     def federated_averaging(self, local_parameters: List[dict], weights: List[float]) -> dict:
         """Perform federated averaging of local model parameters"""
         if not local_parameters or not weights:
             raise ValueError("No parameters or weights provided for averaging")
 
-        # Normalize weights
-        total_weight = sum(weights)
-        normalized_weights = [w / total_weight for w in weights]
-
         # Average parameters based on model type
         if self.global_model.model_type == 'random_forest':
-            # Federated Forest: Aggregate all trees from all local models
-            aggregated_estimators = []
-            for params in local_parameters:
-                if 'estimators_' in params:
-                    aggregated_estimators.extend(params['estimators_'])
+            # Federated Forest: Aggregate trees from all local models, bounded by the selector
+            aggregated_estimators = self.forest_selector.select(local_parameters, weights)
             
-            # Return the full ensemble of trees
+            # Return the ensemble of trees
             # This mathematically represents "averaging" predictions across all local knowledge
             return {
                 'estimators_': aggregated_estimators,
@@ -373,33 +1322,145 @@ class FederatedLearningServer:
             }
 
         elif self.global_model.model_type == 'mlp':
-            # Standard FedAvg: Weighted average of weights and biases
-            avg_coefs = []
-            avg_intercepts = []
+            # Standard FedAvg: Weighted average of weights and biases in one matmul
+            return self.aggregator.aggregate(local_parameters, weights)
+        
+        else:
+             raise ValueError(f"Unsupported model type for aggregation: {self.global_model.model_type}")
 
-            # Initialize with zeros based on the first model's architecture
-            first_params = local_parameters[0]
-            for layer_idx in range(len(first_params['coefs_'])):
-                avg_coefs.append(np.zeros_like(first_params['coefs_'][layer_idx]))
-                avg_intercepts.append(np.zeros_like(first_params['intercepts_'][layer_idx]))
+    def _local_train_options(self, node: FederatedLearningNode, model_type: str) -> dict:
+        """Keyword arguments for node.local_train under the configured local update mode"""
+        options = {}
+        if model_type == 'random_forest' and self.forest_selector.tree_scoring:
+            options['tree_scoring'] = self.forest_selector.tree_scoring
+        if self.local_update == 'refit':
+            return options
+
+        options.update(epochs=self.local_epochs, warm_start=True, trees_per_round=self.trees_per_round)
+        if self.executor != 'sequential' and model_type == 'mlp' and node.global_handle is not None:
+            # Worker copies have no usable handle, so ship the weights along
+            options['initial_parameters'] = node.global_handle.parameters
+        return options
+
+    def _worker_node(self, node: FederatedLearningNode) -> FederatedLearningNode:
+        """Node object to hand to an executor; thread workers get a detached copy"""
+        # Process workers already receive a pickled copy
+        return node if self.executor == 'process' else node.detached_copy()
+
+    @staticmethod
+    def _terminate_workers(executor):
+        """Stop process-pool workers still running timed-out nodes"""
+        if hasattr(executor, 'terminate_workers'):
+            executor.terminate_workers()
+            return
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _create_executor(self):
+        """Create the pool used for parallel local training"""
+        max_workers = self.max_workers or len(self.nodes)
+        if self.executor == 'process':
+            return ProcessPoolExecutor(max_workers=max_workers)
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FL_Node")
+
+    def _collect_worker_result(self, node_id: str, future) -> dict:
+        """Unpack a finished local-training future, installing the worker's state on the node"""
+        try:
+            result, state = future.result()
+        except Exception as e:
+            self.logger.error(f"Node {node_id} worker failed: {e}")
+            return {'success': False, 'message': f'Worker error: {str(e)}', 'metrics': {}}
+
+        # Workers train on a copy of the node; copy the trained state back
+        node = self.nodes[node_id]
+        node.model = state['model']
+        node.training_history = state['training_history']
+        node.last_update = state['last_update']
+        node.preprocessing_cache = state['preprocessing_cache']
+        return result
+
+    def run_local_training(self, model_type: str = 'random_forest') -> Dict[str, dict]:
+        """Train every registered node and return results keyed by node ID.
+
+        Nodes are trained concurrently unless the server runs in sequential mode.
+        Results are gathered as they finish; a node that runs longer than
+        node_timeout seconds is reported as failed and left out of the round.
+        Its late result is discarded: process workers are terminated, and a
+        thread worker (which cannot be stopped) finishes on its private copy
+        while the node sits out later rounds until it does.
+        """
+        results: Dict[str, dict] = {}
+
+        if self.executor == 'sequential':
+            for node_id, node in self.nodes.items():
+                self.logger.info(f"Training on node {node_id}")
+                results[node_id] = node.local_train(model_type, **self._local_train_options(node, model_type))
+            return results
 
-            # Weighted sum
-            total_weight = sum(weights)
-            normalized_weights = [w / total_weight for w in weights]
+        self._stale_workers = {node_id: future for node_id, future in self._stale_workers.items() if not future.done()}
 
-            for params, weight in zip(local_parameters, normalized_weights):
-                for layer_idx in range(len(params['coefs_'])):
-                    avg_coefs[layer_idx] += weight * params['coefs_'][layer_idx]
-                    avg_intercepts[layer_idx] += weight * params['intercepts_'][layer_idx]
+        executor = self._create_executor()
+        futures = {}
+        for node_id, node in self.nodes.items():
+            if node_id in self._stale_workers:
+                self.logger.warning(f"Node {node_id} skipped: its timed-out update is still running")
+                results[node_id] = {
+                    'success': False,
+                    'message': 'Previous timed-out update still running',
+                    'metrics': {}
+                }
+                continue
+            self.logger.info(f"Training on node {node_id}")
+            options = self._local_train_options(node, model_type)
+            futures[executor.submit(_local_train_worker, self._worker_node(node), model_type, options)] = node_id
 
-            return {
-                'coefs_': avg_coefs,
-                'intercepts_': avg_intercepts,
-                'classes_': first_params['classes_']
-            }
-        
-        else:
-             raise ValueError(f"Unsupported model type for aggregation: {self.global_model.model_type}")
+        started = {}
+        timed_out = []
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                for future in pending:
+                    if future not in started and future.running():
+                        started[future] = now
+
+                # Wake up for the next completion or the earliest node deadline
+                timeout = None
+                if self.node_timeout is not None:
+                    deadlines = [started[f] + self.node_timeout - now for f in pending if f in started]
+                    timeout = max(min(deadlines), 0) if len(deadlines) == len(pending) else 0.05
+
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    node_id = futures[future]
+                    results[node_id] = self._collect_worker_result(node_id, future)
+
+                if self.node_timeout is not None:
+                    now = time.monotonic()
+                    for future in list(pending):
+                        if future in started and now - started[future] > self.node_timeout:
+                            node_id = futures[future]
+                            future.cancel()
+                            pending.discard(future)
+                            timed_out.append(node_id)
+                            if self.executor == 'thread':
+                                self._stale_workers[node_id] = future
+                            self.logger.warning(f"Node {node_id} timed out after {self.node_timeout}s")
+                            results[node_id] = {
+                                'success': False,
+                                'message': f'Training timed out after {self.node_timeout}s',
+                                'metrics': {}
+                            }
+        finally:
+            # Do not block the round on workers that exceeded their timeout
+            if timed_out and self.executor == 'process':
+                self._terminate_workers(executor)
+            else:
+                executor.shutdown(wait=not timed_out)
+
+        return results
 
     def training_round(self, model_type: str = 'random_forest', min_participants: int = 1) -> dict:
         """Execute one round of federated training"""
@@ -417,16 +1478,19 @@ class FederatedLearningServer:
         # Initialize global model if needed
         if self.global_model is None:
             self.initialize_global_model(model_type)
+        self._prepare_scaling()
 
         # Collect local training results
         local_results = {}
         local_parameters = []
         weights = []
 
-        # Train on each node
-        for node_id, node in self.nodes.items():
-            self.logger.info(f"Training on node {node_id}")
-            result = node.local_train(model_type)
+        # Train on all nodes (possibly in parallel)
+        node_results = self.run_local_training(model_type)
+
+        # Iterate in registration order so aggregation does not depend on completion order
+        for node_id in self.nodes:
+            result = node_results[node_id]
 
             if result['success'] and result['parameters']:
                 local_results[node_id] = result
@@ -442,16 +1506,32 @@ class FederatedLearningServer:
                 'message': f'Insufficient participants: {len(local_parameters)} < {min_participants}'
             }
 
+        return self._aggregate_round(local_results, local_parameters, weights, round_start_time)
+
+    def _aggregate_round(self, local_results: Dict[str, dict], local_parameters: List[dict],
+                         weights: List[float], round_start_time: datetime,
+                         recipients: Optional[List[str]] = None, round_info: Optional[dict] = None) -> dict:
+        """Average local parameters, publish the new global version and record the round
+
+        recipients limits which nodes receive the new version (all nodes by
+        default); round_info is merged into the stored round result.
+        """
         # Perform federated averaging
         try:
             global_parameters = self.federated_averaging(local_parameters, weights)
 
-            # Update global model
-            self.global_model.set_parameters(global_parameters)
+            # Publish a new version and point the global model at it
+            version = self.model_store.publish(global_parameters)
+            self.global_model.set_parameters(self.model_store.get(version))
 
-            # Update all nodes with global parameters
-            for node_id, node in self.nodes.items():
-                node.update_model(global_parameters)
+            # The global model predicts in the contributors' label encoding and feature scale
+            reference = self.nodes[next(iter(local_results))].model
+            self.global_model.scaler = reference.scaler
+            self.global_model.label_encoder = reference.label_encoder
+
+            # Nodes hold a handle to the version instead of their own copy
+            for node_id in (self.nodes if recipients is None else recipients):
+                self.nodes[node_id].update_model(self.model_store.acquire(version))
 
             # Calculate global metrics
             total_data_points = sum(result['metrics']['consented_data_points'] 
@@ -467,7 +1547,8 @@ class FederatedLearningServer:
                 for result in local_results.values()
             ) / total_data_points if total_data_points > 0 else 0
 
-            # Store round results
+            # Store round results; only per-node metrics are kept, since the local
+            # parameters would keep every round's model alive past the store's eviction
             round_result = {
                 'round': self.current_round,
                 'timestamp': round_start_time.isoformat(),
@@ -476,9 +1557,12 @@ class FederatedLearningServer:
                 'total_consented_data': total_data_points,
                 'global_accuracy': weighted_accuracy,
                 'global_loss': weighted_loss,
-                'local_results': local_results,
+                'local_results': {node_id: {'metrics': result['metrics']}
+                                  for node_id, result in local_results.items()},
+                'global_version': version,
                 'duration': (datetime.now() - round_start_time).total_seconds()
             }
+            round_result.update(round_info or {})
 
             self.training_rounds.append(round_result)
 
@@ -496,8 +1580,18 @@ class FederatedLearningServer:
                 'message': f'Federated averaging failed: {str(e)}'
             }
 
-    def train(self, num_rounds: int, model_type: str = 'random_forest', min_participants: int = 1) -> List[dict]:
-        """Run multiple rounds of federated training"""
+    def train(self, num_rounds: int, model_type: str = 'random_forest', min_participants: int = 1,
+              mode: str = 'sync') -> List[dict]:
+        """Run multiple rounds of federated training
+
+        mode='sync' waits for every node each round; mode='async' aggregates as
+        soon as min_participants updates have arrived (see train_async).
+        """
+        if mode == 'async':
+            return self.train_async(num_rounds, model_type, min_participants)
+        if mode != 'sync':
+            raise ValueError(f"Unsupported training mode: {mode}")
+
         self.is_training = True
         results = []
 
@@ -516,70 +1610,243 @@ class FederatedLearningServer:
 
         return results
 
-    def evaluate_global_model(self, test_data_path: Optional[str] = None) -> dict:
-        """Evaluate the global model"""
-        if self.global_model is None or not self.global_model.is_fitted:
-            return {
-                'success': False,
-                'message': 'No trained global model available'
-            }
+    def staleness_weight(self, staleness: int) -> float:
+        """Polynomial down-weighting of an update computed against an older global version"""
+        return (1.0 + staleness) ** -self.staleness_exponent
+
+    def train_async(self, num_rounds: int, model_type: str = 'random_forest', min_participants: int = 1) -> List[dict]:
+        """Run asynchronous, partial-participation federated training
+
+        Every node trains continuously. A round closes as soon as
+        min_participants updates have arrived; each update is weighted by its
+        data points times staleness_weight(staleness), where staleness is the
+        number of global versions published since the node started training.
+        Contributing nodes then restart from the new version while slower
+        nodes keep running. A node whose update runs longer than node_timeout
+        seconds drops out like a failed node (see run_local_training), and
+        updates still in flight at the end are abandoned rather than awaited.
+        Reports are stored in self.async_report.
+        """
+        if len(self.nodes) == 0:
+            return [{'success': False, 'message': 'No nodes registered'}]
+        if self.executor == 'sequential':
+            raise ValueError("Asynchronous training requires a thread or process executor")
 
-        # If no test data provided, use validation data from nodes
-        if test_data_path is None:
-            # Collect validation metrics from all nodes
-            total_accuracy = 0
-            total_samples = 0
+        if self.global_model is None:
+            self.initialize_global_model(model_type)
+        self._prepare_scaling()
 
-            for node in self.nodes.values():
-                if node.training_history:
-                    last_training = node.training_history[-1]
-                    metrics = last_training['metrics']
-                    samples = metrics['consented_data_points']
+        self.is_training = True
+        results = []
+        report = {
+            'round_wall_times': [],
+            'arrival_counts': {node_id: 0 for node_id in self.nodes},
+            'arrival_latency': {node_id: [] for node_id in self.nodes},
+            'staleness_histogram': {}
+        }
+        self.async_report = report
 
-                    total_accuracy += metrics['val_accuracy'] * samples
-                    total_samples += samples
+        self.logger.info(f"Starting asynchronous federated training: {num_rounds} rounds, "
+                         f"{model_type} model, K={min_participants} of {len(self.nodes)}")
 
-            global_accuracy = total_accuracy / total_samples if total_samples > 0 else 0
+        self._stale_workers = {node_id: future for node_id, future in self._stale_workers.items() if not future.done()}
+        executor = self._create_executor()
+        futures = {}
+        started = {}
+        timed_out = []
 
-            return {
-                'success': True,
-                'global_accuracy': global_accuracy,
-                'total_samples': total_samples,
-                'message': 'Evaluation based on node validation data'
+        def submit(node_id: str):
+            self.logger.info(f"Training on node {node_id}")
+            node = self.nodes[node_id]
+            future = executor.submit(_local_train_worker, self._worker_node(node), model_type,
+                                     self._local_train_options(node, model_type))
+            futures[future] = (node_id, self.model_store.latest_version, time.monotonic())
+
+        try:
+            for node_id in self.nodes:
+                if node_id in self._stale_workers:
+                    self.logger.warning(f"Node {node_id} skipped: its timed-out update is still running")
+                    continue
+                submit(node_id)
+
+            for round_num in range(num_rounds):
+                self.current_round += 1
+                round_start_time = datetime.now()
+                round_start = time.monotonic()
+                arrivals = []
+
+                # Buffer updates until K have arrived
+                while len(arrivals) < min_participants and futures:
+                    now = time.monotonic()
+                    for future in futures:
+                        if future not in started and future.running():
+                            started[future] = now
+
+                    # Wake up for the next arrival or the earliest node deadline
+                    timeout = None
+                    if self.node_timeout is not None:
+                        deadlines = [started[f] + self.node_timeout - now for f in futures if f in started]
+                        timeout = max(min(deadlines), 0) if len(deadlines) == len(futures) else 0.05
+
+                    done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        started.pop(future, None)
+                        node_id, base_version, submitted_at = futures.pop(future)
+                        result = self._collect_worker_result(node_id, future)
+                        if result['success'] and result['parameters']:
+                            arrivals.append((node_id, base_version, result))
+                            report['arrival_counts'][node_id] += 1
+                            report['arrival_latency'][node_id].append(time.monotonic() - submitted_at)
+                        else:
+                            # Failed nodes drop out rather than retrying forever
+                            self.logger.warning(f"Node {node_id} failed training: {result['message']}")
+
+                    if self.node_timeout is not None:
+                        now = time.monotonic()
+                        for future in [f for f in futures if f in started and now - started[f] > self.node_timeout]:
+                            node_id = futures.pop(future)[0]
+                            started.pop(future)
+                            future.cancel()
+                            timed_out.append(node_id)
+                            if self.executor == 'thread':
+                                self._stale_workers[node_id] = future
+                            self.logger.warning(f"Node {node_id} timed out after {self.node_timeout}s")
+
+                if len(arrivals) < min_participants:
+                    results.append({
+                        'success': False,
+                        'message': f'Insufficient participants: {len(arrivals)} < {min_participants}'
+                    })
+                    break
+
+                # Aggregate in registration order so results do not depend on arrival order
+                order = {node_id: idx for idx, node_id in enumerate(self.nodes)}
+                arrivals.sort(key=lambda arrival: order[arrival[0]])
+
+                local_results = {}
+                local_parameters = []
+                weights = []
+                staleness = {}
+                for node_id, base_version, result in arrivals:
+                    node_staleness = self.model_store.latest_version - base_version
+                    staleness[node_id] = node_staleness
+                    report['staleness_histogram'][node_staleness] = report['staleness_histogram'].get(node_staleness, 0) + 1
+
+                    local_results[node_id] = result
+                    local_parameters.append(result['parameters'])
+                    weights.append(result['metrics']['consented_data_points'] * self.staleness_weight(node_staleness))
+
+                result = self._aggregate_round(
+                    local_results, local_parameters, weights, round_start_time,
+                    recipients=list(local_results),
+                    round_info={'mode': 'async', 'staleness': staleness}
+                )
+                results.append(result)
+                report['round_wall_times'].append(time.monotonic() - round_start)
+
+                if not result['success']:
+                    self.logger.error(f"Training stopped at round {round_num + 1}: {result['message']}")
+                    break
+
+                # Contributors restart from the version they just helped build
+                if round_num + 1 < num_rounds:
+                    for node_id in local_results:
+                        submit(node_id)
+        finally:
+            # Stragglers still in flight are abandoned, never awaited
+            if self.executor == 'process' and (futures or timed_out):
+                self._terminate_workers(executor)
+            else:
+                executor.shutdown(wait=False, cancel_futures=True)
+            report['timed_out'] = timed_out
+
+            report['arrival_latency'] = {
+                node_id: float(np.mean(latencies)) if latencies else None
+                for node_id, latencies in report['arrival_latency'].items()
             }
+            self.is_training = False
 
-        else:
-            # Evaluate on external test data
-            try:
-                test_data = pd.read_csv(test_data_path)
+        self.logger.info("Asynchronous federated training completed")
+        return results
 
-                # Apply consent filter
-                consented_test_data = test_data[test_data.get('allow_training', True) == True]
+    def _external_holdout(self, test_data_path: str, target_column: str = 'primary_condition') -> Optional[tuple]:
+        """Consented rows of a test CSV preprocessed with the global model's scaler, cached per file"""
+        scaler = self.global_model.scaler
+        stat = os.stat(test_data_path)
+        key = (stat.st_mtime_ns, stat.st_size, scaler.mean_.tobytes(), scaler.scale_.tobytes())
+        cached = self._external_holdouts.get(test_data_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        test_data = pd.read_csv(test_data_path)
+        if 'allow_training' in test_data.columns:
+            test_data = test_data[test_data['allow_training'] == True]
+        if len(test_data) == 0:
+            return None
+
+        X = self.global_model.transform_features(test_data)
+        labels = test_data[target_column].fillna('Unknown').to_numpy()
+        X.flags.writeable = False
+        labels.flags.writeable = False
+        self._external_holdouts[test_data_path] = (key, (X, labels))
+        return X, labels
 
-                if len(consented_test_data) == 0:
+    def evaluate_global_model(self, test_data_path: Optional[str] = None) -> dict:
+        """Evaluate the global model
+
+        Without a test path the model is scored on every node's cached
+        holdout (see FederatedLearningNode.evaluation_holdout); with one, on
+        the consented rows of that CSV. Preprocessing is never refit on the
+        evaluation data. Returns per-node and pooled metrics together with
+        inference throughput.
+        """
+        if self.global_model is None or not self.global_model.is_fitted:
+            return {
+                'success': False,
+                'message': 'No trained global model available'
+            }
+
+        try:
+            if test_data_path is None:
+                holdouts = {node_id: node.evaluation_holdout() for node_id, node in self.nodes.items()}
+                holdouts = {node_id: holdout for node_id, holdout in holdouts.items() if holdout is not None}
+                if not holdouts:
+                    return {
+                        'success': False,
+                        'message': 'No consented holdout data available'
+                    }
+                message = 'Evaluation on node holdout data'
+            else:
+                holdout = self._external_holdout(test_data_path)
+                if holdout is None:
                     return {
                         'success': False,
                         'message': 'No consented test data available'
                     }
+                holdouts = {'external': holdout}
+                message = 'Evaluation on external test data'
 
-                # Preprocess and evaluate
-                X_test, y_test = self.global_model.preprocess_data(consented_test_data)
-                predictions = self.global_model.predict(X_test)
-                accuracy = accuracy_score(y_test, predictions)
-
-                return {
-                    'success': True,
-                    'test_accuracy': accuracy,
-                    'test_samples': len(consented_test_data),
-                    'classification_report': classification_report(y_test, predictions, output_dict=True),
-                    'message': 'Evaluation on external test data'
-                }
+            report = self.evaluator.evaluate(self.global_model, holdouts)
+            pooled = report['pooled']
+            self.logger.info(f"Global model evaluated on {pooled['samples']} rows - "
+                             f"Accuracy: {pooled['accuracy']:.4f}, {report['rows_per_second']:.0f} rows/s")
 
-            except Exception as e:
-                return {
-                    'success': False,
-                    'message': f'Error evaluating on test data: {str(e)}'
-                }
+            result = {
+                'success': True,
+                'global_accuracy': pooled['accuracy'],
+                'total_samples': pooled['samples'],
+                'evaluation': report,
+                'message': message
+            }
+            if test_data_path is not None:
+                result.update({'test_accuracy': pooled['accuracy'], 'test_samples': pooled['samples']})
+            return result
+
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error evaluating global model: {str(e)}'
+            }
 
     def get_training_summary(self) -> dict:
         """Get comprehensive training summary"""
@@ -601,7 +1868,8 @@ class FederatedLearningServer:
             'total_consented_data': latest_round['total_consented_data'],
             'training_history': self.training_rounds,
             'model_type': self.global_model.model_type if self.global_model else None,
-            'is_training': self.is_training
+            'is_training': self.is_training,
+            'async_report': self.async_report
         }
 
     def save_global_model(self, filepath: str) -> bool:
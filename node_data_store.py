@@ -0,0 +1,139 @@
+"""
+Memory-mapped columnar store for hospital node datasets
+
+Each node CSV is converted once into one .npy file per column under a
+.node_store/ directory next to the CSV. Later loads read only the columns
+training needs instead of parsing the whole CSV, and the store is rebuilt
+automatically when the CSV changes on disk.
+
+Only numeric and boolean columns stay memory-mapped. String columns
+(patient_id, primary_condition, expiry_date) are stored as fixed-width
+arrays but loaded into ordinary object Series, so they occupy memory like
+a CSV load would; the saving is in parse time and in the numeric columns.
+"""
+
+import json
+import os
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns used by local training and consent filtering
+FEATURE_COLUMNS = ['age', 'systolic_bp', 'diastolic_bp', 'heart_rate',
+                   'temperature', 'glucose_level', 'cholesterol', 'bmi']
+TRAINING_COLUMNS = ['patient_id'] + FEATURE_COLUMNS + ['primary_condition', 'allow_training', 'expiry_date']
+# Flags stored as bool whatever the CSV holds; a missing value means False
+BOOL_COLUMNS = ['allow_training']
+
+STORE_DIRNAME = '.node_store'
+MANIFEST_FILE = 'manifest.json'
+# Bumped whenever the on-disk layout changes, so older stores are rebuilt
+STORE_VERSION = 2
+
+logger = logging.getLogger("NodeDataStore")
+
+
+class ColumnarNodeStore:
+    """Per-column .npy layout for one node CSV"""
+
+    def __init__(self, csv_path: str, store_root: Optional[str] = None):
+        self.csv_path = csv_path
+        root = store_root or os.path.join(os.path.dirname(os.path.abspath(csv_path)), STORE_DIRNAME)
+        self.store_dir = os.path.join(root, os.path.basename(csv_path))
+
+    def _source_signature(self) -> dict:
+        stat = os.stat(self.csv_path)
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.store_dir, MANIFEST_FILE)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def is_current(self) -> bool:
+        """True if the store exists and was built from the current CSV"""
+        manifest = self._read_manifest()
+        return (manifest is not None and manifest.get('version') == STORE_VERSION
+                and manifest.get('source') == self._source_signature())
+
+    def build(self) -> dict:
+        """Convert the CSV into one .npy file per column"""
+        data = pd.read_csv(self.csv_path)
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        columns = {}
+        for column in data.columns:
+            series = data[column]
+            if column in BOOL_COLUMNS:
+                # A single missing flag would otherwise turn the column into strings
+                values = series.astype(str).str.lower().isin(['true', '1', '1.0']).to_numpy()
+                kind = 'numeric'
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                values = series.to_numpy()
+                kind = 'numeric'
+            else:
+                # Fixed-width strings keep the column mappable; '' marks a missing value
+                values = series.fillna('').astype(str).to_numpy(dtype=str)
+                kind = 'string'
+            np.save(os.path.join(self.store_dir, f"{column}.npy"), values, allow_pickle=False)
+            columns[column] = kind
+
+        manifest = {
+            'version': STORE_VERSION,
+            'source': self._source_signature(),
+            'rows': len(data),
+            'columns': columns
+        }
+        # Write the manifest last so a partial build is never considered current
+        with open(os.path.join(self.store_dir, MANIFEST_FILE), 'w') as fh:
+            json.dump(manifest, fh)
+
+        logger.info(f"Built columnar store for {self.csv_path}: {len(data)} rows, {len(columns)} columns")
+        return manifest
+
+    def open_columns(self, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Memory-map the requested columns, building the store first if stale
+
+        Arrays are mapped copy-on-write, so in-memory consent updates never
+        touch the files on disk.
+        """
+        if not self.is_current():
+            self.build()
+        manifest = self._read_manifest()
+
+        wanted = [c for c in (columns or list(manifest['columns'])) if c in manifest['columns']]
+        return {
+            column: np.load(os.path.join(self.store_dir, f"{column}.npy"), mmap_mode='c', allow_pickle=False)
+            for column in wanted
+        }
+
+    def load_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame over the mapped columns
+
+        Numeric columns wrap the memory maps; string columns are copied into
+        object Series with missing values restored.
+        """
+        arrays = self.open_columns(columns)
+        manifest_columns = self._read_manifest()['columns']
+
+        frame = {}
+        for column, values in arrays.items():
+            if manifest_columns[column] == 'string':
+                frame[column] = pd.Series(values, dtype=object).replace('', np.nan)
+            else:
+                frame[column] = values
+        return pd.DataFrame(frame, copy=False)
+
+
+def load_node_frame(csv_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load a node dataset through its columnar store, falling back to the CSV"""
+    try:
+        return ColumnarNodeStore(csv_path).load_frame(TRAINING_COLUMNS if columns is None else columns)
+    except OSError as e:
+        logger.warning(f"Columnar store unavailable for {csv_path} ({e}); reading CSV")
+        data = pd.read_csv(csv_path)
+        return data[[c for c in (TRAINING_COLUMNS if columns is None else columns) if c in data.columns]]
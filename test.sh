@@ -89,6 +89,10 @@ except:
     print('⚠️  Web application test incomplete')
 " 2>/dev/null || echo "⚠️  Web application test skipped"
 
+# Test 6: Unit tests
+echo "Test 6: Unit tests..."
+python -m pytest -q tests && echo "✓ Unit tests passed" || echo "❌ Unit tests failed"
+
 echo ""
 echo "🎯 Test Summary:"
 echo "- If all tests show ✓, the system is ready"
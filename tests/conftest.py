@@ -0,0 +1,53 @@
+"""
+Shared fixtures: tests run against copies of the repository's CSVs in
+temporary directories, so journals, stores and compaction never touch the
+checked-in data.
+"""
+
+import glob
+import os
+import shutil
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def copy_csvs(target_dir):
+    for path in glob.glob(os.path.join(REPO_ROOT, '*.csv')):
+        shutil.copy(path, target_dir)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A directory holding fresh copies of the CSVs"""
+    copy_csvs(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The Flask app module, imported and bootstrapped inside a scratch directory
+
+    app.py opens its journal and chain store relative to the working
+    directory at import time, so the import happens after the chdir.
+    """
+    workdir = tmp_path_factory.mktemp('app')
+    copy_csvs(workdir)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import app
+        app.load_initial_data()
+        yield app
+    finally:
+        os.chdir(previous)
+
+
+@pytest.fixture
+def client(app_module):
+    app_module.app.config['TESTING'] = True
+    return app_module.app.test_client()
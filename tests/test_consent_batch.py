@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+BATCH_URL = '/api/update_consent/batch'
+
+
+def _login(client, role, entity_id):
+    with client.session_transaction() as session:
+        session['auth'] = {'role': role, 'entity_id': entity_id}
+
+
+@pytest.fixture
+def nft_patients(app_module):
+    """Patient IDs that exist and have an NFT record"""
+    store = app_module.patient_store
+    patient_ids = [record['patient_id'] for record in store.patients(limit=200)]
+    return sorted(store.nft_patient_ids(patient_ids))
+
+
+def _consent(app_module, patient_id):
+    return app_module.patient_store.patients(patient_id=patient_id)[0]['allow_training']
+
+
+def test_unknown_patients_are_reported_and_not_journaled(app_module, client):
+    journaled = len(app_module.consent_journal.pending())
+
+    response = client.post(BATCH_URL, json=[{'patient_id': 'NOPE1', 'allow_training': True},
+                                            {'patient_id': 'NOPE2', 'allow_training': False}])
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['applied'] == 0
+    assert body['chain_updates'] == 0
+    assert [(error['index'], error['patient_id']) for error in body['errors']] == [(0, 'NOPE1'), (1, 'NOPE2')]
+    assert len(app_module.consent_journal.pending()) == journaled
+
+
+@pytest.mark.parametrize('flag, expected', [(False, False), ('false', False), ('FALSE', False), (0, False),
+                                            ('0', False), (True, True), ('true', True), (1, True)])
+def test_allow_training_accepts_only_explicit_booleans(app_module, client, nft_patients, flag, expected):
+    patient_id = nft_patients[0]
+    client.post(BATCH_URL, json=[{'patient_id': patient_id, 'allow_training': not expected}])
+
+    body = client.post(BATCH_URL, json=[{'patient_id': patient_id, 'allow_training': flag}]).get_json()
+
+    assert body['applied'] == 1 and body['errors'] == []
+    assert _consent(app_module, patient_id) is expected
+
+
+@pytest.mark.parametrize('flag', ['no', 'yes', '', 2, 1.0, None, [], {}])
+def test_other_allow_training_values_are_errors(app_module, client, nft_patients, flag):
+    patient_id = nft_patients[1]
+    before = _consent(app_module, patient_id)
+
+    body = client.post(BATCH_URL, json=[{'patient_id': patient_id, 'allow_training': flag}]).get_json()
+
+    assert body['applied'] == 0
+    assert body['errors'][0]['index'] == 0
+    assert _consent(app_module, patient_id) == before
+
+
+@pytest.mark.parametrize('payload', ['5', '"updates"', 'true', '{"updates": 3}', '{"updates": {"patient_id": "P1"}}'])
+def test_bodies_that_are_not_lists_are_rejected(client, payload):
+    response = client.post(BATCH_URL, data=payload, content_type='application/json')
+
+    assert response.status_code == 400
+
+
+def test_ndjson_batches_are_accepted(app_module, client, nft_patients):
+    body = '\n'.join(json.dumps({'patient_id': pid, 'allow_training': True}) for pid in nft_patients[2:4])
+
+    response = client.post(BATCH_URL, data=body, content_type='application/x-ndjson')
+
+    assert response.get_json()['applied'] == 2
+    assert all(_consent(app_module, pid) is True for pid in nft_patients[2:4])
+
+
+def test_batch_updates_are_mined_and_provable(app_module, client, nft_patients):
+    patient_id = nft_patients[4]
+
+    body = client.post(BATCH_URL, json=[{'patient_id': patient_id, 'allow_training': True}]).get_json()
+
+    assert body['chain_updates'] == 1
+    assert body['block_index'] == app_module.nft_manager.blockchain.get_latest_block().index
+    assert client.get(f'/api/consent_proof/{patient_id}').status_code == 200
+
+
+def test_audit_log_requires_a_login(client):
+    assert client.get('/api/audit_log').status_code == 401
+
+
+def test_hospital_audit_log_is_limited_to_its_patients(app_module, client, nft_patients):
+    client.post(BATCH_URL, json=[{'patient_id': pid, 'allow_training': True} for pid in nft_patients[:10]])
+    node_id, node = next(iter(app_module.fl_engine.nodes.items()))
+    own = app_module.patient_store.hospital_patient_ids(node['hospital_name'])
+    other = next(pid for pid in nft_patients if pid not in own)
+
+    _login(client, 'hospital', node_id)
+    response = client.get('/api/audit_log')
+    entries = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.status_code == 200
+    assert all(entry['patient_id'] in own for entry in entries)
+    assert client.get(f'/api/audit_log?patient_id={other}').status_code == 403
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+HOSPITAL_FILE = 'node_veterans_affairs_hos_data.csv'
+
+
+@pytest.fixture
+def journal(app_module, data_dir):
+    journal = app_module.ConsentJournal(str(data_dir / 'consent_journal.db'), str(data_dir / 'nft_metadata.csv'),
+                                        lambda: [str(data_dir / HOSPITAL_FILE)])
+    yield journal
+    journal.conn.close()
+
+
+@pytest.fixture
+def patient(data_dir):
+    """A patient of the hospital file with an NFT record, and their current consent"""
+    nft_metadata = pd.read_csv(data_dir / 'nft_metadata.csv')
+    hospital = pd.read_csv(data_dir / HOSPITAL_FILE)
+    patient_id = next(pid for pid in hospital['patient_id'] if pid in set(nft_metadata['patient_id']))
+    current = bool(nft_metadata.set_index('patient_id').loc[patient_id, 'allow_training'])
+    return patient_id, current
+
+
+def _consent(path, patient_id):
+    return bool(pd.read_csv(path).set_index('patient_id').loc[patient_id, 'allow_training'])
+
+
+def test_pending_updates_survive_reopening_the_journal(app_module, journal, data_dir, patient):
+    patient_id, current = patient
+    journal.append(patient_id, not current, '2026-01-01 00:00:00', '2030-01-01')
+
+    reopened = app_module.ConsentJournal(journal.db_path, journal.nft_path, journal.hospital_files)
+    pending = reopened.pending()
+    reopened.conn.close()
+
+    assert [(e['patient_id'], e['allow_training'], e['expiry_date']) for e in pending] == \
+        [(patient_id, not current, '2030-01-01')]
+
+
+def test_patient_store_replays_uncompacted_updates(app_module, journal, data_dir, patient):
+    patient_id, current = patient
+    journal.append(patient_id, not current, '2026-01-01 00:00:00')
+
+    store = app_module.PatientStore(str(data_dir / 'patient_dataset.csv'), str(data_dir / 'nft_metadata.csv'),
+                                    journal=journal)
+
+    assert store.patients(patient_id=patient_id)[0]['allow_training'] == (not current)
+    assert _consent(data_dir / 'nft_metadata.csv', patient_id) == current
+
+
+def test_compaction_rewrites_the_csvs_with_the_last_update(journal, data_dir, patient):
+    patient_id, current = patient
+    journal.append_many([
+        {'patient_id': patient_id, 'allow_training': current, 'consent_timestamp': '2026-01-01 00:00:00',
+         'wallet_address': '0xabc'},
+        {'patient_id': patient_id, 'allow_training': not current, 'consent_timestamp': '2026-01-02 00:00:00'}
+    ])
+
+    assert journal.compact() == 2
+    assert journal.pending() == []
+
+    nft_row = pd.read_csv(data_dir / 'nft_metadata.csv').set_index('patient_id').loc[patient_id]
+    assert bool(nft_row['allow_training']) == (not current)
+    assert nft_row['consent_timestamp'] == '2026-01-02 00:00:00'
+    # Optional fields keep the last value any update supplied
+    assert nft_row['wallet_id'] == '0xabc'
+    assert _consent(data_dir / HOSPITAL_FILE, patient_id) == (not current)
+    assert journal.compact() == 0
+
+
+def test_compaction_targets_follow_the_registered_node_files(app_module):
+    data_paths = {node['data_path'] for node in app_module.fl_engine.nodes.values()}
+
+    assert HOSPITAL_FILE in data_paths
+    assert set(app_module.consent_journal.hospital_files()) == data_paths
@@ -0,0 +1,63 @@
+import hashlib
+import json
+
+import pytest
+
+from blockchain_nft_system import (Block, BlockchainNetwork, _LEAF_PREFIX, _hash_pair, hash_transaction,
+                                   merkle_proof, merkle_root, verify_merkle_proof)
+
+
+def _transactions(count):
+    return [{'type': 'consent_update', 'patient_id': f'P{i:06d}', 'allow_training': bool(i % 2)}
+            for i in range(count)]
+
+
+def test_leaves_and_interior_nodes_hash_in_separate_domains():
+    left, right = (hash_transaction(tx) for tx in _transactions(2))
+
+    assert hash_transaction({'a': 1}) != hashlib.sha256(json.dumps({'a': 1}).encode()).hexdigest()
+    # An interior node can never be presented as the leaf of the same bytes
+    assert _hash_pair(left, right) != hashlib.sha256(_LEAF_PREFIX + (left + right).encode()).hexdigest()
+    assert _hash_pair(left, right) != hashlib.sha256((left + right).encode()).hexdigest()
+
+
+@pytest.mark.parametrize('count', [3, 5, 7, 9])
+def test_duplicating_the_last_transaction_changes_the_root(count):
+    hashes = [hash_transaction(tx) for tx in _transactions(count)]
+
+    assert merkle_root(hashes + hashes[-1:]) != merkle_root(hashes)
+
+
+def test_block_with_a_duplicated_transaction_fails_validation():
+    block = Block(1, _transactions(3), 0.0, '0' * 64)
+    assert block.has_valid_merkle_root()
+
+    block.transactions.append(dict(block.transactions[-1]))
+    assert not block.has_valid_merkle_root()
+
+
+@pytest.mark.parametrize('count', range(1, 18))
+def test_every_leaf_proof_verifies(count):
+    hashes = [hash_transaction(tx) for tx in _transactions(count)]
+    root = merkle_root(hashes)
+
+    for index, leaf in enumerate(hashes):
+        assert verify_merkle_proof(leaf, merkle_proof(hashes, index), root)
+    assert not verify_merkle_proof(hash_transaction({'forged': True}), merkle_proof(hashes, 0), root)
+
+
+def test_inclusion_is_checked_against_the_header_count_and_index():
+    network = BlockchainNetwork(difficulty=1)
+    transactions = _transactions(4)
+    network.add_transactions([dict(tx) for tx in transactions])
+    network.mine_pending_transactions()
+
+    block = network.get_latest_block()
+    proof = network.get_transaction_proof(block.index, 2)
+    assert network.verify_transaction_inclusion(block.transactions[2], proof)
+    assert not network.verify_transaction_inclusion(block.transactions[3], proof)
+
+    assert not network.verify_transaction_inclusion(block.transactions[2],
+                                                    dict(proof, transaction_count=block.transaction_count + 1))
+    assert not network.verify_transaction_inclusion(block.transactions[2],
+                                                    dict(proof, tx_index=block.transaction_count))